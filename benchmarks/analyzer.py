@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Single-Pass-Analyzer gegen die bisherige Mehrfach-Auswertung
+Misst CPU-Zeit und Speicher-Peak für einen Login-Zyklus
+(Login-Seite, Login-POST mit Noten-Liste, Noten-Seite)
+"""
+
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT))
+
+from bs4 import BeautifulSoup
+
+from benchmarks.pages import grade_entries, grade_page, login_page, make_response
+from src.analyzer import ResponseAnalyzer
+from src.grades import Grade
+from src.logger import Logger
+from src.parsers import PARSER_BACKENDS, available_backends
+
+def legacy_cycle(login_response, post_response, grade_response):
+    """Bisheriger Ablauf: jede Antwort wird mehrfach dekodiert und geparst"""
+    # _login + _extract_form_data
+    soup = BeautifulSoup(login_response.text, "html.parser")
+    soup.find("form")
+    form_data = {}
+    for input_field in soup.find_all("input", type="hidden"):
+        if input_field.get("name"):
+            form_data[input_field.get("name")] = input_field.get("value", "")
+
+    # _is_login_successful
+    success = any(
+        [
+            "noten-und-pruefungen" in post_response.url.lower(),
+            "anmelden" not in post_response.text.lower(),
+            post_response.status_code == 200,
+        ]
+    ) and not any(
+        [
+            "fehler" in post_response.text.lower(),
+            "ungültig" in post_response.text.lower(),
+            "benutzername oder passwort" in post_response.text.lower(),
+        ]
+    )
+
+    # get_grades + _parse_grades
+    soup = BeautifulSoup(grade_response.text, "html.parser")
+    grades = []
+    for element in soup.select(
+        ".align-items-baseline.collapsed.list-group-item.list-group-custom-item"
+    ):
+        grade_span = element.select_one("span")
+        if not grade_span:
+            continue
+        grade_text = grade_span.get_text(strip=True)
+        if not re.match(r"^\d+,\d+$", grade_text):
+            continue
+        module_element = element.select_one("div > h4")
+        if not module_element:
+            continue
+        grades.append({"grade": grade_text, "module": module_element.get_text(strip=True)})
+
+    return success, form_data, grades
+
+
+def analyzer_cycle(analyzer, login_response, post_response):
+    """Neuer Ablauf: Login-Seite und Login-Antwort je einmal analysiert"""
+    form_data = analyzer.analyze(login_response).form_data
+    analysis = analyzer.analyze(post_response)
+    return analysis.login_successful, form_data, analysis.grades
+
+
+def measure(func, iterations: int) -> tuple:
+    """Liefert (CPU-ms pro Zyklus, Speicher-Peak in KiB)"""
+    func()  # Warm-up
+
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    cpu_ms = (time.process_time() - start) * 1000 / iterations
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return cpu_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grades", type=int, default=60, help="Noten pro Seite")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print("HTW Noten-Checker - Benchmark Response-Analyzer")
+    print("=" * 50)
+
+    html = grade_page(grade_entries(args.grades))
+    login_response = make_response(login_page())
+    post_response = make_response(html)
+    grade_response = make_response(html)
+
+    logger = Logger(log_level="WARNING")
+    results = [
+        (
+            "bisher (html.parser, 3 Parses)",
+            measure(
+                lambda: legacy_cycle(login_response, post_response, grade_response),
+                args.iterations,
+            ),
+        )
+    ]
+
+    success, form_data, legacy_grades = legacy_cycle(
+        login_response, post_response, grade_response
+    )
+    expected = (
+        success,
+        form_data,
+        [Grade.from_text(grade["grade"], grade["module"]) for grade in legacy_grades],
+    )
+    for name in available_backends():
+        analyzer = ResponseAnalyzer(PARSER_BACKENDS[name](logger), logger)
+        actual = analyzer_cycle(analyzer, login_response, post_response)
+        if actual != expected:
+            print(f"❌ Analyzer ({name}) liefert abweichende Ergebnisse!")
+            return 1
+
+        results.append(
+            (
+                f"Analyzer ({name})",
+                measure(
+                    lambda: analyzer_cycle(analyzer, login_response, post_response),
+                    args.iterations,
+                ),
+            )
+        )
+
+    baseline_cpu, baseline_peak = results[0][1]
+    print(f"{'Variante':<34} {'CPU/Zyklus':>12} {'Peak':>12} {'Faktor':>8}")
+    for name, (cpu_ms, peak_kib) in results:
+        print(
+            f"{name:<34} {cpu_ms:>9.2f} ms {peak_kib:>8.0f} KiB "
+            f"{baseline_cpu / cpu_ms:>7.1f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
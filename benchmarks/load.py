@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Lastbenchmark: K simulierte Accounts gegen das lokale Mock-Portal
+Misst Latenz pro Prüfzyklus (p50/p95/p99), Requests pro Zyklus und Durchsatz
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# src vor benchmarks/, sonst findet "import analyzer" benchmarks/analyzer.py
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.append(str(ROOT))
+
+from benchmarks.mock_portal import MockPortal
+from src.config import Config
+from src.logger import Logger
+from src.scraper import HTWDScraper
+
+
+def write_account_configs(directory: Path, url: str, args) -> list:
+    """Eine .env pro simuliertem Account, wie im Multi-User-Betrieb"""
+    configs = []
+    for index in range(args.accounts):
+        env_file = directory / f"bench{index}.env"
+        env_file.write_text(
+            f"HTWD_URL={url}\n"
+            f"HTWD_USERNAME=bench{index}\n"
+            f"HTWD_PASSWORD={args.password}\n"
+            "TELEGRAM_ENABLED=true\n"
+            "TELEGRAM_BOT_TOKEN=bench\n"
+            "TELEGRAM_CHAT_ID=1\n"
+            f"PERSISTENT_SESSION={'false' if args.fresh_login else 'true'}\n"
+            f"PARSER_BACKEND={args.parser}\n"
+            f"MAX_CONNECTIONS_PER_HOST={args.concurrency}\n"
+        )
+        configs.append(Config(env_file=str(env_file)))
+    return configs
+
+
+def timed_cycle(scraper) -> float:
+    """Ein Prüfzyklus (get_grades) in Millisekunden"""
+    start = time.perf_counter()
+    if scraper.get_grades() is None:
+        raise RuntimeError(
+            f"Zyklus fehlgeschlagen für {scraper.config.htwd_username}"
+        )
+    scraper.commit()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_threaded(configs: list, logger, args) -> list:
+    """Synchroner Scraper, Accounts parallel in einem Thread-Pool"""
+    scrapers = [HTWDScraper(config, logger) for config in configs]
+    latencies = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.cycles):
+            latencies.extend(pool.map(timed_cycle, scrapers))
+    for scraper in scrapers:
+        scraper.close()
+    return latencies
+
+
+async def run_async(configs: list, logger, args) -> list:
+    """Asynchroner Scraper, alle Accounts in einer Event-Loop"""
+    # aiohttp nur importieren, wenn der asynchrone Scraper gemessen wird
+    from src.async_scraper import AsyncHTWDScraper, create_connector
+
+    # MAX_CONNECTIONS_PER_HOST aus den Account-Configs (--concurrency)
+    connector = create_connector(configs[0].max_connections_per_host)
+    scrapers = [AsyncHTWDScraper(config, logger, connector) for config in configs]
+
+    async def timed(scraper) -> float:
+        start = time.perf_counter()
+        if await scraper.get_grades() is None:
+            raise RuntimeError(
+                f"Zyklus fehlgeschlagen für {scraper.config.htwd_username}"
+            )
+        scraper.commit()
+        return (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for _ in range(args.cycles):
+        latencies.extend(await asyncio.gather(*(timed(s) for s in scrapers)))
+    for scraper in scrapers:
+        await scraper.close()
+    await connector.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=20, help="Anzahl Accounts (K)")
+    parser.add_argument("--cycles", type=int, default=5, help="Zyklen pro Account")
+    parser.add_argument("--grades", type=int, default=60, help="Noten pro Seite")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--parser", default="auto", help="PARSER_BACKEND")
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument(
+        "--fresh-login", action="store_true", help="PERSISTENT_SESSION=false"
+    )
+    parser.add_argument("--etag", action="store_true", help="Portal liefert ETag/304")
+    parser.add_argument("--session-ttl", type=float, help="Session-Ablauf im Portal")
+    parser.add_argument("--password", default="secret")
+    args = parser.parse_args()
+
+    print("HTW Noten-Checker - Lastbenchmark gegen Mock-Portal")
+    print("=" * 50)
+
+    portal = MockPortal(
+        grades=args.grades,
+        password=args.password,
+        session_ttl=args.session_ttl,
+        etag=args.etag,
+    ).start()
+    logger = Logger(
+        log_level="ERROR", log_dir=tempfile.mkdtemp(prefix="htwd-bench-")
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        configs = write_account_configs(Path(directory), portal.url, args)
+
+        start = time.perf_counter()
+        try:
+            if args.use_async:
+                latencies = asyncio.run(run_async(configs, logger, args))
+            else:
+                latencies = run_threaded(configs, logger, args)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        finally:
+            portal.stop()
+        elapsed = time.perf_counter() - start
+
+    total_cycles = len(latencies)
+    stats = portal.stats
+    requests_total = stats["GET"] + stats["POST"]
+    # quantiles[p - 1] ist das p-te Perzentil
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    print(
+        f"Accounts: {args.accounts}, Zyklen: {args.cycles}, Noten: {args.grades}, "
+        f"Parallelität: {args.concurrency}, "
+        f"Scraper: {'async' if args.use_async else 'threads'}"
+    )
+    for p in (50, 95, 99):
+        print(f"{f'Latenz p{p}':<24} {quantiles[p - 1]:>10.1f} ms")
+    print(f"{'Requests pro Zyklus':<24} {requests_total / total_cycles:>10.2f}")
+    print(
+        f"{'  davon':<24} {stats['login']} Logins, {stats['grade_page']} Noten-Seiten, "
+        f"{stats['not_modified']} × 304, {stats['login_page']} Login-Seiten"
+    )
+    print(f"{'Durchsatz':<24} {total_cycles / elapsed:>10.1f} Zyklen/s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks für Parser und Noten-Vergleich
+Misst die Funktionen eines Prüfzyklus einzeln bei 10 bis 10.000 Noten,
+schreibt die Ergebnisse als JSON und vergleicht sie mit einer Baseline
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# src vor benchmarks/, sonst findet "import analyzer" benchmarks/analyzer.py
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.append(str(ROOT))
+
+from benchmarks.pages import grade_entries, grade_page, login_page, make_response
+from src.config import Config
+from src.diff import diff_grades
+from src.grades import Grade
+from src.logger import Logger
+from src.scraper import HTWDScraper
+
+SIZES = [10, 100, 1000, 10000]
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+
+def create_scraper(parser_backend: str, directory: Path) -> HTWDScraper:
+    """Scraper mit minimaler Konfiguration, ohne Netzwerk"""
+    env_file = directory / "bench.env"
+    env_file.write_text(
+        "HTWD_USERNAME=bench\n"
+        "HTWD_PASSWORD=bench\n"
+        "TELEGRAM_ENABLED=true\n"
+        "TELEGRAM_BOT_TOKEN=bench\n"
+        "TELEGRAM_CHAT_ID=1\n"
+        f"PARSER_BACKEND={parser_backend}\n"
+        "DEBUG=false\n"
+    )
+    logger = Logger(log_level="ERROR", log_dir=str(directory))
+    return HTWDScraper(Config(env_file=str(env_file)), logger)
+
+
+def time_call(func, repeat: int) -> float:
+    """Beste Laufzeit pro Aufruf in Mikrosekunden"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def changed_grades(grades: list) -> list:
+    """Nächster Stand: eine Note korrigiert, eine neu"""
+    current = list(grades)
+    if current:
+        first = current[0]
+        current[0] = Grade(first.module, first.hundredths + 30)
+    current.append(Grade.from_text("1,0", "Neues Modul"))
+    return current
+
+
+def run_benchmarks(scraper: HTWDScraper, sizes: list, repeat: int) -> list:
+    """Misst alle Funktionen für jede Seitengröße"""
+    results = []
+
+    def record(name: str, entries, func):
+        us = time_call(func, repeat)
+        results.append(
+            {"name": name, "entries": entries, "us_per_call": round(us, 2)}
+        )
+        size = "-" if entries is None else entries
+        print(f"{name:<22} {size:>8} {us:>14.1f} µs")
+
+    def form_data(response):
+        return scraper._form_data_from(scraper.analyzer.analyze(response))
+
+    def grades_of(response):
+        return scraper._grades_from(scraper.analyzer.analyze(response))
+
+    # Login-Formular hängt nicht von der Anzahl Noten ab
+    login_response = make_response(login_page())
+    record("extract_form_data", None, lambda: form_data(login_response))
+
+    for size in sizes:
+        response = make_response(grade_page(grade_entries(size)))
+        grades = grades_of(response)
+        current = changed_grades(grades)
+
+        # Derselbe Weg wie im Prüfzyklus: Analyse inkl. Parsing
+        record("parse_grades", size, lambda: grades_of(response))
+        record(
+            "is_login_successful",
+            size,
+            lambda: scraper._is_login_successful(response),
+        )
+        record("diff_grades", size, lambda: diff_grades(grades, current))
+
+    return results
+
+
+def compare(results: list, baseline: dict, threshold: float) -> int:
+    """Vergleicht mit der Baseline, liefert die Anzahl Regressionen"""
+    reference = {
+        (entry["name"], entry["entries"]): entry["us_per_call"]
+        for entry in baseline["results"]
+    }
+    regressions = 0
+
+    print()
+    print(f"Vergleich mit Baseline ({baseline['parser']}, Schwelle {threshold:g}x)")
+    for entry in results:
+        before = reference.get((entry["name"], entry["entries"]))
+        if not before:
+            continue
+        ratio = entry["us_per_call"] / before
+        marker = "❌" if ratio > threshold else "✅"
+        regressions += ratio > threshold
+        size = "-" if entry["entries"] is None else entry["entries"]
+        print(f"{marker} {entry['name']:<22} {size:>8} {ratio:>8.2f}x")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parser", default="auto", help="PARSER_BACKEND")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Ergebnisse als JSON in diese Datei")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Ergebnisse als Baseline speichern"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.5, help="Erlaubter Faktor zur Baseline"
+    )
+    args = parser.parse_args()
+
+    print("HTW Noten-Checker - Microbenchmarks")
+    print("=" * 50)
+
+    # Konfiguration und Log nur für die Dauer des Laufs
+    with tempfile.TemporaryDirectory(prefix="htwd-bench-") as directory:
+        scraper = create_scraper(args.parser, Path(directory))
+        try:
+            print(f"Parser: {scraper.parser.name}")
+            print(f"{'Funktion':<22} {'Noten':>8} {'Zeit/Aufruf':>17}")
+            report = {
+                "parser": scraper.parser.name,
+                "python": platform.python_version(),
+                "results": run_benchmarks(scraper, args.sizes, args.repeat),
+            }
+        finally:
+            scraper.logger.close()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Ergebnisse gespeichert: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"Baseline gespeichert: {baseline_path}")
+        return 0
+
+    # Ohne Baseline kann keine Regression erkannt werden
+    if not baseline_path.exists():
+        print(f"❌ Keine Baseline unter {baseline_path} (--save-baseline)")
+        return 1
+
+    baseline = json.loads(baseline_path.read_text())
+    if baseline["parser"] != report["parser"]:
+        print(f"⚠️  Baseline wurde mit {baseline['parser']} erstellt")
+
+    regressions = compare(report["results"], baseline, args.threshold)
+    if regressions:
+        print(f"❌ {regressions} Regression(en) gegenüber der Baseline!")
+        return 1
+
+    print("✅ Keine Regressionen gegenüber der Baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Lokaler Mock des HTW-Portals für Benchmarks und Tests
+Liefert Login-Formular und Noten-Seite im Markup des Portals
+"""
+
+import argparse
+import hashlib
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+from benchmarks.pages import grade_entries, grade_page, login_page
+
+PORTAL_PATH = "/de/mein-studium/noten-und-pruefungen"
+SESSION_COOKIE = "fe_typo_user"
+FORM_TOKEN = "mock"
+
+
+class MockPortal:
+    """Mock-Portal in einem Hintergrund-Thread
+
+    Jeder Benutzername wird mit dem konfigurierten Passwort akzeptiert.
+    Sessions laufen optional nach session_ttl Sekunden ab.
+    """
+
+    def __init__(
+        self,
+        grades: int = 60,
+        password: str = "secret",
+        session_ttl: Optional[float] = None,
+        etag: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.password = password
+        self.session_ttl = session_ttl
+        self.etag = etag
+        self.sessions = {}  # Session-ID → Login-Zeitpunkt
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self.set_grades(grade_entries(grades))
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{PORTAL_PATH}"
+
+    def set_grades(self, entries: list):
+        """Ersetzt die Noten-Seite (z.B. um neue Noten zu simulieren)"""
+        page = grade_page(entries).encode()
+        with self.lock:
+            self.grade_page = page
+            digest = hashlib.blake2b(page, digest_size=8).hexdigest()
+            self.grade_etag = f'"{digest}"'
+
+    def start(self) -> "MockPortal":
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="mock-portal", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats.clear()
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _session_valid(self, session_id: Optional[str]) -> bool:
+        with self.lock:
+            created = self.sessions.get(session_id)
+            if created is None:
+                return False
+            if self.session_ttl and time.monotonic() - created > self.session_ttl:
+                del self.sessions[session_id]
+                return False
+            return True
+
+    def _new_session(self) -> str:
+        session_id = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[session_id] = time.monotonic()
+        return session_id
+
+    def _handler_class(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _session_id(self) -> Optional[str]:
+                for cookie in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = cookie.strip().partition("=")
+                    if name == SESSION_COOKIE:
+                        return value
+                return None
+
+            def _send(self, status: int, body: bytes = b"", headers: dict = None):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                portal._count("GET")
+                if not portal._session_valid(self._session_id()):
+                    portal._count("login_page")
+                    return self._send(200, login_page(FORM_TOKEN).encode())
+
+                with portal.lock:
+                    page, etag = portal.grade_page, portal.grade_etag
+
+                if portal.etag and self.headers.get("If-None-Match") == etag:
+                    portal._count("not_modified")
+                    return self._send(304, headers={"ETag": etag})
+
+                portal._count("grade_page")
+                headers = {"ETag": etag} if portal.etag else {}
+                self._send(200, page, headers)
+
+            def do_POST(self):
+                portal._count("POST")
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode())
+
+                valid = (
+                    form.get("__trustedProperties") == [f"{FORM_TOKEN}-tp"]
+                    and form.get("user", [""])[0]
+                    and form.get("pass") == [portal.password]
+                )
+                if not valid:
+                    portal._count("login_failed")
+                    return self._send(200, login_page(FORM_TOKEN, error=True).encode())
+
+                # Wie das Portal: Redirect auf die Noten-Seite mit Session-Cookie
+                portal._count("login")
+                self._send(
+                    303,
+                    headers={
+                        "Location": self.path,
+                        "Set-Cookie": (
+                            f"{SESSION_COOKIE}={portal._new_session()}; Path=/"
+                        ),
+                    },
+                )
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--grades", type=int, default=60, help="Noten pro Seite")
+    parser.add_argument("--password", default="secret")
+    parser.add_argument("--session-ttl", type=float, help="Session-Ablauf in Sekunden")
+    parser.add_argument("--etag", action="store_true", help="ETag/304 unterstützen")
+    args = parser.parse_args()
+
+    portal = MockPortal(
+        grades=args.grades,
+        password=args.password,
+        session_ttl=args.session_ttl,
+        etag=args.etag,
+        host="0.0.0.0",
+        port=args.port,
+    )
+    print(f"Mock-Portal läuft auf http://localhost:{args.port}{PORTAL_PATH}")
+    print(f"Passwort für alle Benutzer: {args.password}")
+    try:
+        portal.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,106 @@
+"""
+Synthetische Portal-Seiten für Benchmarks und den Mock-Server
+"""
+
+import random
+
+import requests
+
+GRADE_URL = "https://mobil.htw-dresden.de/de/mein-studium/noten-und-pruefungen"
+
+ITEM_CLASSES = "align-items-baseline collapsed list-group-item list-group-custom-item"
+
+MODULE_NAMES = [
+    "Mathematik",
+    "Programmierung",
+    "Datenbanken",
+    "Betriebssysteme",
+    "Rechnernetze",
+    "Software Engineering",
+    "Künstliche Intelligenz",
+    "IT-Sicherheit",
+    "Computergrafik",
+    "Theoretische Informatik",
+]
+
+NON_NUMERIC_GRADES = ["bestanden", "nicht bestanden", "angemeldet", "-"]
+
+
+def grade_entries(count: int, seed: int = 42) -> list:
+    """Erzeugt (Note, Modul)-Paare, jede 7. Note ist nicht numerisch"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        module = f"{MODULE_NAMES[i % len(MODULE_NAMES)]} {i // len(MODULE_NAMES) + 1}"
+        if i % 7 == 6:
+            grade = rng.choice(NON_NUMERIC_GRADES)
+        else:
+            grade = f"{rng.randint(1, 4)},{rng.choice([0, 3, 7])}"
+        entries.append((grade, module))
+    return entries
+
+
+def grade_item(grade: str, module: str, index: int = 0) -> str:
+    """Ein Noten-Eintrag im Markup des Portals"""
+    return (
+        f'<a class="{ITEM_CLASSES}" data-toggle="collapse" href="#exam-{index}" '
+        f'role="button" aria-expanded="false">\n'
+        f'  <span class="badge badge-pill badge-primary">{grade}</span>\n'
+        f'  <div class="ml-3">\n'
+        f"    <h4 class=\"mb-1\">{module}</h4>\n"
+        f'    <small class="text-muted">Prüfungsnummer {10000 + index} · '
+        f"Sommersemester</small>\n"
+        f"  </div>\n"
+        f"</a>\n"
+        f'<div class="collapse" id="exam-{index}"><p>Versuch 1, '
+        f"Prüfer: Prof. Dr. Beispiel</p></div>\n"
+    )
+
+
+def grade_page(entries: list, csrf_token: str = "bench") -> str:
+    """Vollständige Noten-Seite inkl. Navigation und Footer"""
+    items = "".join(grade_item(g, m, i) for i, (g, m) in enumerate(entries))
+    return (
+        "<!DOCTYPE html>\n<html lang=\"de\"><head><meta charset=\"utf-8\">"
+        "<title>Noten und Prüfungen - HTW Dresden</title>"
+        f'<meta name="csrf-token" content="{csrf_token}">'
+        '<link rel="stylesheet" href="/typo3conf/ext/htwd/css/main.css"></head>'
+        '<body><nav class="navbar"><a href="/de/mein-studium">Mein Studium</a>'
+        '<a href="/de/logout">Abmelden</a></nav>'
+        '<main class="container"><h1>Noten und Prüfungen</h1>'
+        f'<div class="list-group list-group-custom">\n{items}</div></main>'
+        '<footer><p>&copy; HTW Dresden</p></footer></body></html>'
+    )
+
+
+def login_page(token: str = "bench", error: bool = False) -> str:
+    """Login-Formular mit versteckten Feldern (optional mit Fehlermeldung)"""
+    message = (
+        '<div class="alert alert-danger">Benutzername oder Passwort ungültig</div>'
+        if error
+        else ""
+    )
+    return (
+        "<!DOCTYPE html>\n<html lang=\"de\"><head><meta charset=\"utf-8\">"
+        "<title>Anmelden - HTW Dresden</title></head><body>"
+        f'<main class="container"><h1>Anmelden</h1>{message}'
+        '<form method="post" action="">'
+        f'<input type="hidden" name="__referrer[@request]" value="{token}">'
+        f'<input type="hidden" name="__trustedProperties" value="{token}-tp">'
+        '<input type="hidden" name="logintype" value="login">'
+        '<input type="hidden" name="pid" value="42">'
+        '<input type="text" name="user" autocomplete="username">'
+        '<input type="password" name="pass" autocomplete="current-password">'
+        '<input type="submit" name="submit" value="Anmelden">'
+        "</form></main></body></html>"
+    )
+
+
+def make_response(html: str, url: str = GRADE_URL) -> requests.Response:
+    """Baut eine requests.Response ohne Netzwerk"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = html.encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    return response
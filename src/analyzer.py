@@ -0,0 +1,168 @@
+"""
+Single-Pass-Analyse von Portal-Antworten
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+from grades import Grade
+
+# Passwort-Feld des Login-Formulars (Session abgelaufen)
+LOGIN_FORM_PATTERN = re.compile(r"<input[^>]+name=[\"']pass[\"']", re.IGNORECASE)
+
+# CSS-Klasse der Noten-Einträge
+GRADE_LIST_MARKER = "list-group-custom-item"
+
+# Tag-Name am Anfang eines Start-Tags (Element eines Noten-Eintrags)
+ITEM_TAG_PATTERN = re.compile(rb"<([a-zA-Z][a-zA-Z0-9]*)")
+
+# Fehler-Indikatoren nach fehlgeschlagenem Login
+ERROR_MARKERS = ("fehler", "ungültig", "benutzername oder passwort")
+
+
+class ResponseAnalysis:
+    """Ergebnis der Analyse einer Portal-Antwort"""
+
+    __slots__ = (
+        "status_code",
+        "url",
+        "size",
+        "redirected",
+        "login_form",
+        "anmelden_markup",
+        "error_markers",
+        "has_grade_list",
+        "form_data",
+        "grades",
+        "fingerprint",
+        "unchanged",
+    )
+
+    def __init__(self, status_code: int, url: str, size: int, redirected: bool):
+        self.status_code = status_code
+        self.url = url
+        self.size = size
+        self.redirected = redirected
+        self.login_form = False
+        self.anmelden_markup = False
+        self.error_markers: List[str] = []
+        self.has_grade_list = False
+        self.form_data: Optional[Dict[str, str]] = None
+        self.grades: Optional[List[Grade]] = None
+        self.fingerprint: Optional[str] = None
+        self.unchanged = False
+
+    @property
+    def on_grade_page(self) -> bool:
+        return "noten-und-pruefungen" in self.url.lower()
+
+    @property
+    def login_successful(self) -> bool:
+        """Login-Erfolg nach den bisherigen Erfolgs- und Fehler-Indikatoren"""
+        success_indicators = [
+            self.on_grade_page,
+            not self.anmelden_markup,
+            self.status_code == 200,
+        ]
+        return any(success_indicators) and not self.error_markers
+
+    @property
+    def session_expired(self) -> bool:
+        """Login-Formular statt Noten-Seite (Umleitung oder Markup)"""
+        if self.redirected and not self.on_grade_page:
+            return True
+        return self.login_form
+
+
+class ResponseAnalyzer:
+    """Liest eine Antwort einmal und liefert Login-Status, Formular und Noten"""
+
+    def __init__(self, parser, logger):
+        self.parser = parser
+        self.logger = logger
+
+    @staticmethod
+    def _item_end(content: bytes, position: int) -> int:
+        """Ende des Elements, dessen Start-Tag die Position enthält
+
+        Zählt gleichnamige Tags mit, damit verschachtelte Elemente (z.B. div)
+        den Eintrag nicht vorzeitig beenden. Ohne End-Tag: Ende des Dokuments.
+        """
+        tag = ITEM_TAG_PATTERN.match(content, content.rfind(b"<", 0, position))
+        if not tag:
+            return len(content)
+
+        depth = 1
+        pattern = re.compile(rb"<(/?)" + re.escape(tag.group(1)) + rb"\b", re.I)
+        for match in pattern.finditer(content, position):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                end = content.find(b">", match.end())
+                return len(content) if end == -1 else end + 1
+        return len(content)
+
+    @classmethod
+    def fingerprint(cls, content: bytes) -> Optional[str]:
+        """Hash über den Bereich der Noten-Liste (ohne Header, Tokens etc.)
+
+        Reicht bis zum Ende des letzten Eintrags, damit auch Noten hinter der
+        Modul-Überschrift erfasst werden.
+        """
+        marker = GRADE_LIST_MARKER.encode()
+        start = content.find(marker)
+        if start == -1:
+            return None
+
+        end = cls._item_end(content, content.rfind(marker))
+        return hashlib.blake2b(content[start:end], digest_size=16).hexdigest()
+
+    def analyze(
+        self,
+        response,
+        previous_fingerprint: Optional[str] = None,
+        parse: bool = True,
+    ) -> ResponseAnalysis:
+        """Analysiert eine Antwort; parse=False prüft nur die Marker"""
+        content = response.content
+        analysis = ResponseAnalysis(
+            response.status_code, response.url, len(content), bool(response.history)
+        )
+
+        # Text nur einmal dekodieren und einmal in Kleinbuchstaben wandeln
+        text = response.text
+        lowered = text.lower()
+
+        analysis.login_form = bool(LOGIN_FORM_PATTERN.search(text))
+        analysis.anmelden_markup = "anmelden" in lowered
+        analysis.error_markers = [m for m in ERROR_MARKERS if m in lowered]
+        analysis.has_grade_list = GRADE_LIST_MARKER in text
+
+        if analysis.has_grade_list:
+            analysis.fingerprint = self.fingerprint(content)
+            analysis.unchanged = (
+                analysis.fingerprint is not None
+                and analysis.fingerprint == previous_fingerprint
+            )
+
+        if not parse:
+            return analysis
+
+        # Formular und Noten aus einem einzigen Parser-Durchlauf
+        want_form = analysis.login_form or (
+            "<form" in lowered and not analysis.has_grade_list
+        )
+        want_grades = analysis.has_grade_list and not analysis.unchanged
+        if want_form or want_grades:
+            try:
+                form_data, grades = self.parser.parse_document(
+                    text, form=want_form, grades=want_grades
+                )
+                analysis.form_data = form_data
+                analysis.grades = grades
+            except Exception as e:
+                self.logger.error("Fehler beim Parsen der Antwort: {error}", error=e)
+                if want_grades:
+                    analysis.grades = []
+
+        return analysis
@@ -0,0 +1,229 @@
+"""
+Asynchroner Web-Scraper für viele Accounts in einer Event-Loop
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+import metrics
+from analyzer import ResponseAnalysis
+from grades import Grade
+from scraper import BaseScraper
+
+# Gleiche Retry-Strategie wie urllib3 im synchronen Scraper
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RETRY_TOTAL = 3
+BACKOFF_FACTOR = 1
+
+DEFAULT_LIMIT_PER_HOST = 10
+
+
+class FetchedResponse:
+    """Vollständig gelesene Antwort mit requests-kompatiblen Attributen"""
+
+    def __init__(
+        self, status_code: int, url: str, headers, content: bytes, encoding: str, history
+    ):
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.history = history
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+def create_connector(
+    limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+) -> aiohttp.TCPConnector:
+    """Gemeinsamer Connection-Pool, begrenzt gleichzeitige Verbindungen pro Host"""
+    return aiohttp.TCPConnector(limit=0, limit_per_host=limit_per_host)
+
+
+class AsyncHTWDScraper(BaseScraper):
+    """aiohttp-Variante von HTWDScraper mit gleichem Login → Abruf → Parse-Ablauf"""
+
+    def __init__(
+        self,
+        config,
+        logger,
+        connector: Optional[aiohttp.TCPConnector] = None,
+        rate_limiter=None,
+    ):
+        super().__init__(config, logger, rate_limiter)
+        self.connector = connector
+        self.timeout = aiohttp.ClientTimeout(total=10)
+
+    def _create_session(self) -> Optional[aiohttp.ClientSession]:
+        """Erstellt eine Session mit eigenem Cookie-Jar auf dem gemeinsamen Pool"""
+        try:
+            # Ohne gemeinsamen Pool ein eigener, ebenfalls pro Host begrenzt
+            connector = self.connector or create_connector(
+                self.config.max_connections_per_host
+            )
+            return aiohttp.ClientSession(
+                connector=connector,
+                connector_owner=self.connector is None,
+                headers=self.headers,
+                timeout=self.timeout,
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+            )
+        except Exception as e:
+            self.logger.error("Fehler beim Erstellen der Session: {error}", error=e)
+            return None
+
+    async def _request(
+        self, phase: str, method: str, url: str, **kwargs
+    ) -> FetchedResponse:
+        """Führt einen Request mit Retry/Backoff aus und liest die Antwort komplett"""
+        with self.trace.span(phase) as span:
+            for attempt in range(RETRY_TOTAL + 1):
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire_async()
+                async with self.session.request(method, url, **kwargs) as response:
+                    if response.status in RETRY_STATUS and attempt < RETRY_TOTAL:
+                        retry_after = response.headers.get("Retry-After", "")
+                        delay = (
+                            float(retry_after)
+                            if retry_after.isdigit()
+                            else BACKOFF_FACTOR * (2**attempt)
+                        )
+                        self.logger.debug(
+                            "HTTP {status} - Wiederholung in {delay:.0f}s",
+                            status=response.status,
+                            delay=delay,
+                        )
+                        metrics.RETRIES.inc(user=self.config.htwd_username)
+                        await asyncio.sleep(delay)
+                        continue
+
+                    content = await response.read()
+                    span.update(
+                        status=response.status, bytes=len(content), retries=attempt
+                    )
+                    self.logger.log_request_debug(url, response.status, len(content))
+                    return FetchedResponse(
+                        response.status,
+                        str(response.url),
+                        response.headers,
+                        content,
+                        response.get_encoding(),
+                        response.history,
+                    )
+
+    async def _login(self) -> bool:
+        """Führt Login auf HTW-Portal durch"""
+        try:
+            await self.close()
+            if not self._open_session():
+                return False
+
+            # Erste Anfrage um Login-Seite zu laden
+            form_data = self._login_form_data(
+                await self._request("login_page", "GET", self.config.htwd_url)
+            )
+            if form_data is None:
+                return False
+
+            # Login durchführen
+            login_response = await self._request(
+                "login_post", "POST", self.config.htwd_url, data=form_data
+            )
+            if self._accept_login(login_response):
+                return True
+            await self.close()
+            return False
+
+        except asyncio.TimeoutError:
+            self.logger.error("Login-Timeout - Server nicht erreichbar")
+            return False
+        except aiohttp.ClientError as e:
+            self.logger.error("Login-Fehler: {error}", error=e)
+            return False
+        except Exception as e:
+            self.logger.error("Unerwarteter Login-Fehler: {error}", error=e)
+            return False
+
+    async def _get_grade_page(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> FetchedResponse:
+        """Lädt die Noten-Seite mit der bestehenden Session"""
+        with metrics.FETCH_SECONDS.time(user=self.config.htwd_username):
+            return await self._request(
+                "grade_page", "GET", self.config.htwd_url, headers=headers
+            )
+
+    async def _login_and_fetch(self) -> Optional[ResponseAnalysis]:
+        """Meldet sich an und liefert die analysierte Noten-Seite"""
+        start = time.perf_counter()
+        success = await self._login()
+        self._record_login(start, success)
+        if not success:
+            return None
+
+        # Login-Antwort landet per Redirect meist schon auf der Noten-Seite
+        return self._login_grades() or self._grade_analysis(
+            await self._get_grade_page()
+        )
+
+    async def _fetch_grade_page(self) -> Optional[ResponseAnalysis]:
+        """Lädt die Noten-Seite, meldet sich bei abgelaufener Session neu an"""
+        if self.session is None:
+            return await self._login_and_fetch()
+
+        # Conditional Request, falls das Portal ETag/Last-Modified liefert
+        analysis = self._grade_analysis(await self._get_grade_page(self.validators))
+        if self._session_expired(analysis):
+            return await self._login_and_fetch()
+        return analysis
+
+    async def get_grades(self) -> Optional[List[Grade]]:
+        """Hauptfunktion zum Abrufen der Noten (danach commit() aufrufen)"""
+        self._begin_cycle()
+        try:
+            # Ohne persistente Session bei jedem Durchlauf neu anmelden
+            if not self.config.persistent_session:
+                await self.close()
+
+            # Noten-Seite laden und analysieren
+            analysis = await self._fetch_grade_page()
+            if analysis is None:
+                await self.close()
+                return None
+
+            grades = self._grades_from_analysis(analysis)
+            if grades is None:
+                await self.close()
+            return grades
+
+        except Exception as e:
+            self.logger.error("Fehler beim Abrufen der Noten: {error}", error=e)
+            # Session verwerfen, nächster Durchlauf meldet sich neu an
+            await self.close()
+            return None
+
+        finally:
+            if not self.config.persistent_session:
+                await self.close()
+
+    async def close(self):
+        """Schließt die Session (der gemeinsame Pool bleibt offen)"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+
+async def poll_all(
+    scrapers: List[AsyncHTWDScraper],
+) -> List[Optional[List[Grade]]]:
+    """Fragt alle Accounts gleichzeitig ab, Reihenfolge wie übergeben
+
+    Der Aufrufer übernimmt den Stand nach der Verarbeitung mit commit().
+    """
+    return await asyncio.gather(*(scraper.get_grades() for scraper in scrapers))
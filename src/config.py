@@ -3,77 +3,297 @@ Konfigurationsmanagement für HTW Noten-Checker
 """
 
 import os
-from typing import Optional
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv
+
+
+class setting:
+    """Wie property, aber pro Snapshot nur einmal gelesen und geparst"""
+
+    def __init__(self, parse):
+        self.parse = parse
+        self.__doc__ = parse.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, config, owner=None):
+        if config is None:
+            return self
+        values = config._snapshot.values
+        try:
+            return values[self.name]
+        except KeyError:  # nur beim Laden eines neuen Snapshots
+            value = values[self.name] = self.parse(config)
+            return value
+
+    def __set__(self, config, value):
+        raise AttributeError(f"Konfiguration ist unveränderlich: {self.name}")
+
+
+class ConfigSnapshot:
+    """Unveränderlicher Stand der Konfiguration (Rohwerte und geparste Werte)"""
+
+    __slots__ = ("env", "values", "mtime")
+
+    def __init__(self, env: Dict[str, str], mtime: Optional[int]):
+        self.env = MappingProxyType(env)
+        self.values = {}
+        self.mtime = mtime
 
 
 class Config:
-    """Zentrale Konfigurationsklasse"""
+    """Zentrale Konfigurationsklasse
 
-    def __init__(self):
-        load_dotenv()
-        self._validate_config()
+    Alle Werte werden beim Laden einmal geparst und validiert. reload()
+    ersetzt den Snapshot atomar, laufende Zugriffe sehen entweder den alten
+    oder den neuen Stand.
+    """
+
+    def __init__(self, env_file: Optional[str] = None):
+        # ENV_FILE: eingebundene Benutzer-.env, deren Änderungen übernommen werden
+        self.env_file = env_file = env_file or os.getenv("ENV_FILE")
+        # Ohne env_file wie load_dotenv(): .env ergänzt das Prozess-Environment
+        self.dotenv_path = None if env_file else find_dotenv() or None
+        self._process_env = dict(os.environ)
+        self._rejected_mtime = None
+        self._snapshot = self._load()
 
-    # HTW Credentials
     @property
+    def path(self) -> Optional[str]:
+        """Datei, aus der die Konfiguration gelesen wird"""
+        return self.env_file or self.dotenv_path
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns if self.path else None
+        except OSError:
+            return None
+
+    def _read_env(self) -> Dict[str, str]:
+        values = {}
+        if self.path and os.path.exists(self.path):
+            values = {
+                k: v for k, v in dotenv_values(self.path).items() if v is not None
+            }
+
+        if self.env_file:
+            # Eigene Werte pro Benutzer, ohne das Prozess-Environment zu verändern
+            return {**self._process_env, **values}
+        return {**values, **self._process_env}
+
+    @classmethod
+    def _setting_names(cls) -> List[str]:
+        return [name for name in dir(cls) if isinstance(getattr(cls, name), setting)]
+
+    def _load(self) -> ConfigSnapshot:
+        """Liest, parst und validiert die Konfiguration in einen neuen Snapshot"""
+        staged = object.__new__(type(self))
+        staged.__dict__.update(self.__dict__)
+        staged._snapshot = snapshot = ConfigSnapshot(self._read_env(), self._mtime())
+
+        staged._validate_config()
+        for name in self._setting_names():
+            try:
+                getattr(staged, name)
+            except ValueError as e:
+                raise ValueError(f"Ungültiger Wert für {name.upper()}: {e}")
+
+        snapshot.values = MappingProxyType(snapshot.values)
+        return snapshot
+
+    def reload(self) -> List[str]:
+        """Lädt die Konfiguration neu und liefert die Namen geänderter Werte
+
+        Bei ungültiger Konfiguration (ValueError) bleibt der bisherige Stand aktiv.
+        """
+        mtime = self._mtime()
+        try:
+            snapshot = self._load()
+        except ValueError:
+            self._rejected_mtime = mtime
+            raise
+
+        previous, self._snapshot = self._snapshot, snapshot
+        return [
+            name
+            for name, value in snapshot.values.items()
+            if previous.values.get(name) != value
+        ]
+
+    def changed_on_disk(self) -> bool:
+        """Prüft, ob die Datei seit dem letzten (versuchten) Laden geändert wurde"""
+        mtime = self._mtime()
+        return mtime not in (self._snapshot.mtime, self._rejected_mtime)
+
+    def _get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._snapshot.env.get(key, default)
+
+    # HTW Credentials
+    @setting
     def htwd_url(self) -> str:
-        return os.getenv(
+        return self._get(
             "HTWD_URL",
             "https://mobil.htw-dresden.de/de/mein-studium/noten-und-pruefungen",
         )
 
-    @property
+    @setting
     def htwd_username(self) -> str:
-        return os.getenv("HTWD_USERNAME", "")
+        return self._get("HTWD_USERNAME", "")
 
-    @property
+    @setting
     def htwd_password(self) -> str:
-        return os.getenv("HTWD_PASSWORD", "")
+        return self._get("HTWD_PASSWORD", "")
 
     # Application Config
-    @property
+    @setting
     def poll_interval(self) -> int:
-        return int(os.getenv("POLL_INTERVAL", "600"))
+        return int(self._get("POLL_INTERVAL", "600"))
 
-    @property
+    @setting
     def post_individual_grades(self) -> bool:
-        return os.getenv("POST_GRADES", "true").lower() == "true"
+        return self._get("POST_GRADES", "true").lower() == "true"
 
-    @property
+    @setting
+    def batch_grades(self) -> bool:
+        return self._get("BATCH_GRADES", "false").lower() == "true"
+
+    @setting
     def debug_mode(self) -> bool:
-        return os.getenv("DEBUG", "false").lower() == "true"
+        return self._get("DEBUG", "false").lower() == "true"
+
+    @setting
+    def persistent_session(self) -> bool:
+        return self._get("PERSISTENT_SESSION", "true").lower() == "true"
+
+    @setting
+    def parser_backend(self) -> str:
+        return self._get("PARSER_BACKEND", "auto").lower()
+
+    @setting
+    def max_connections_per_host(self) -> int:
+        return int(self._get("MAX_CONNECTIONS_PER_HOST", "10"))
+
+    # Adaptive Polling Config
+    @setting
+    def adaptive_polling(self) -> bool:
+        return self._get("ADAPTIVE_POLLING", "false").lower() == "true"
+
+    @setting
+    def poll_interval_min(self) -> int:
+        return int(self._get("POLL_INTERVAL_MIN", "120"))
+
+    @setting
+    def poll_interval_max(self) -> int:
+        return int(self._get("POLL_INTERVAL_MAX", "3600"))
+
+    @setting
+    def poll_backoff_factor(self) -> float:
+        return float(self._get("POLL_BACKOFF_FACTOR", "1.5"))
+
+    @setting
+    def result_windows(self) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """Ergebnis-Zeiträume als ((Monat, Tag), (Monat, Tag)), Format MM-DD:MM-DD"""
+        windows = []
+        for window in self._get("RESULT_WINDOWS", "").split(","):
+            if not window.strip():
+                continue
+            start, end = window.strip().split(":")
+            windows.append((self._month_day(start), self._month_day(end)))
+        return windows
+
+    @staticmethod
+    def _month_day(value: str) -> Tuple[int, int]:
+        month, day = (int(part) for part in value.split("-"))
+        if not (1 <= month <= 12 and 1 <= day <= 31):
+            raise ValueError(f"Ungültiges Datum: {value}")
+        return month, day
+
+    # Metrics Config
+    @setting
+    def metrics_port(self) -> int:
+        return int(self._get("METRICS_PORT", "0"))
+
+    # Control Config
+    @setting
+    def control_socket(self) -> str:
+        return self._get("CONTROL_SOCKET", "")
+
+    # Tracing Config
+    @setting
+    def trace_cycles(self) -> bool:
+        return self._get("TRACE_CYCLES", "false").lower() == "true"
+
+    # Notification Config
+    @setting
+    def notification_timeout(self) -> float:
+        return float(self._get("NOTIFICATION_TIMEOUT", "15"))
+
+    @setting
+    def notification_outbox(self) -> bool:
+        return self._get("NOTIFICATION_OUTBOX", "true").lower() == "true"
 
     # Pushbullet Config
-    @property
+    @setting
     def pushbullet_enabled(self) -> bool:
-        return os.getenv("PUSHBULLET_ENABLED", "false").lower() == "true"
+        return self._get("PUSHBULLET_ENABLED", "false").lower() == "true"
 
-    @property
+    @setting
     def pushbullet_token(self) -> Optional[str]:
-        return os.getenv("PUSHBULLET_TOKEN")
+        return self._get("PUSHBULLET_TOKEN")
 
     # Telegram Config
-    @property
+    @setting
     def telegram_enabled(self) -> bool:
-        return os.getenv("TELEGRAM_ENABLED", "false").lower() == "true"
+        return self._get("TELEGRAM_ENABLED", "false").lower() == "true"
 
-    @property
+    @setting
     def telegram_bot_token(self) -> Optional[str]:
-        return os.getenv("TELEGRAM_BOT_TOKEN")
+        return self._get("TELEGRAM_BOT_TOKEN")
 
-    @property
+    @setting
     def telegram_chat_id(self) -> Optional[str]:
-        return os.getenv("TELEGRAM_CHAT_ID")
+        return self._get("TELEGRAM_CHAT_ID")
 
     # Logging Config
-    @property
+    @setting
     def log_level(self) -> str:
-        return os.getenv("LOG_LEVEL", "INFO").upper()
+        return self._get("LOG_LEVEL", "INFO").upper()
 
-    @property
+    @setting
     def log_dir(self) -> str:
-        return os.getenv("LOG_DIR", "logs")
+        return self._get("LOG_DIR", "logs")
+
+    @setting
+    def log_async(self) -> bool:
+        return self._get("LOG_ASYNC", "true").lower() == "true"
+
+    @setting
+    def log_max_bytes(self) -> int:
+        return int(self._get("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+
+    @setting
+    def log_backup_count(self) -> int:
+        return int(self._get("LOG_BACKUP_COUNT", "3"))
+
+    @setting
+    def log_compress(self) -> bool:
+        return self._get("LOG_COMPRESS", "false").lower() == "true"
+
+    @setting
+    def log_format(self) -> str:
+        return self._get("LOG_FORMAT", "text").lower()
+
+    # State Config
+    @setting
+    def persist_state(self) -> bool:
+        return self._get("PERSIST_STATE", "true").lower() == "true"
+
+    @setting
+    def state_file(self) -> str:
+        return self._get("STATE_FILE") or os.path.join(self.log_dir, "state.db")
 
     def _validate_config(self):
         """Validiert die wichtigsten Konfigurationswerte"""
@@ -100,6 +320,42 @@ class Config:
                 "Mindestens ein Benachrichtigungsdienst muss aktiviert sein"
             )
 
+        if self.poll_interval <= 0:
+            raise ValueError("POLL_INTERVAL muss größer 0 sein")
+
+        if self.notification_timeout <= 0:
+            raise ValueError("NOTIFICATION_TIMEOUT muss größer 0 sein")
+
+        if self.log_max_bytes < 0:
+            raise ValueError("LOG_MAX_BYTES darf nicht negativ sein")
+
+        if self.log_backup_count < 0:
+            raise ValueError("LOG_BACKUP_COUNT darf nicht negativ sein")
+
+        if self.log_level not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+            raise ValueError(
+                "LOG_LEVEL muss DEBUG, INFO, WARNING, ERROR oder CRITICAL sein"
+            )
+
+        if self.log_format not in ("text", "json"):
+            raise ValueError("LOG_FORMAT muss 'text' oder 'json' sein")
+
+        if self.adaptive_polling:
+            if not 0 < self.poll_interval_min <= self.poll_interval_max:
+                raise ValueError(
+                    "POLL_INTERVAL_MIN muss größer 0 und kleiner gleich POLL_INTERVAL_MAX sein"
+                )
+
+            if self.poll_backoff_factor < 1:
+                raise ValueError("POLL_BACKOFF_FACTOR muss mindestens 1 sein")
+
+            try:
+                self.result_windows
+            except ValueError:
+                raise ValueError(
+                    "RESULT_WINDOWS muss das Format MM-DD:MM-DD[,MM-DD:MM-DD] haben"
+                )
+
     def get_enabled_notification_services(self) -> list:
         """Gibt Liste der aktivierten Benachrichtigungsdienste zurück"""
         services = []
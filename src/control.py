@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Lokale Steuerung über einen Unix-Socket: sofort prüfen, pausieren, Status
+
+Eine Zeile pro Befehl ("check", "pause", "resume" oder "status", optional
+gefolgt von Benutzernamen), die Antwort ist eine JSON-Zeile. Ohne Benutzer
+gilt der Befehl für alle Benutzer des Prozesses.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+if TYPE_CHECKING:
+    from main import GradeChecker
+
+COMMANDS = ("check", "pause", "resume", "status")
+DEFAULT_SOCKET = "/tmp/htwd-checker.sock"
+
+
+class ControlServer:
+    """Nimmt Befehle auf dem Unix-Socket entgegen (Hintergrund-Thread)"""
+
+    def __init__(
+        self,
+        path: str,
+        checkers: Dict[str, "GradeChecker"],
+        check_now: Callable[[str], None],
+        logger,
+    ):
+        self.path = path
+        self.checkers = checkers
+        self.check_now = check_now
+        self.logger = logger
+        self.server = None
+
+    def _remove_stale_socket(self):
+        """Entfernt einen verwaisten Socket, bricht ab wenn er noch benutzt wird"""
+        if not os.path.exists(self.path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+                return
+        raise OSError(f"Steuer-Socket {self.path} wird bereits verwendet")
+
+    def start(self) -> "ControlServer":
+        self._remove_stale_socket()
+        control = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = control.handle(line.decode("utf-8", "replace"))
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(self.path, 0o600)  # nur der eigene Benutzer darf steuern
+        threading.Thread(
+            target=self.server.serve_forever, name="control", daemon=True
+        ).start()
+        self.logger.info("Steuerung über {path}", path=self.path)
+        return self
+
+    def _select(self, users: List[str]) -> Dict[str, "GradeChecker"]:
+        if not users:
+            return self.checkers
+        unknown = [user for user in users if user not in self.checkers]
+        if unknown:
+            raise KeyError(", ".join(unknown))
+        return {user: self.checkers[user] for user in users}
+
+    def handle(self, line: str) -> dict:
+        """Führt einen Befehl aus und liefert die Antwort"""
+        parts = line.split()
+        if not parts or parts[0].lower() not in COMMANDS:
+            return {"ok": False, "error": f"Befehle: {', '.join(COMMANDS)}"}
+
+        command, users = parts[0].lower(), parts[1:]
+        try:
+            selected = self._select(users)
+        except KeyError as e:
+            return {"ok": False, "error": f"Unbekannte Benutzer: {e.args[0]}"}
+
+        if command == "status":
+            return {
+                "ok": True,
+                "users": [checker.status() for checker in selected.values()],
+            }
+
+        for user, checker in selected.items():
+            if command == "check":
+                self.check_now(user)
+            elif command == "pause":
+                checker.pause()
+            else:
+                checker.resume()
+        return {"ok": True, "command": command, "users": list(selected)}
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def send_command(path: str, command: str, timeout: float = 5) -> dict:
+    """Sendet einen Befehl an einen laufenden Checker"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(command.encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reply:
+            return json.loads(reply.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("users", nargs="*", help="Benutzer (Standard: alle)")
+    parser.add_argument(
+        "--socket", default=os.getenv("CONTROL_SOCKET") or DEFAULT_SOCKET
+    )
+    args = parser.parse_args()
+
+    try:
+        response = send_command(args.socket, " ".join([args.command, *args.users]))
+    except OSError as e:
+        print(f"❌ Keine Verbindung zu {args.socket}: {e}")
+        return 1
+
+    print(json.dumps(response, indent=2, ensure_ascii=False))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
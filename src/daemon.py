@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+HTW Dresden Noten-Checker - Multi-User-Daemon
+
+Lädt alle users/*.env und überwacht alle Benutzer in einem Prozess.
+Zustand, Logs und Benachrichtigungen bleiben pro Benutzer getrennt.
+"""
+
+import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import metrics
+from config import Config
+from logger import Logger
+from control import ControlServer
+from main import GradeChecker
+from scheduler import StaggeredScheduler, TokenBucket
+
+
+class MultiUserDaemon:
+    """Plant die Prüfungen aller Benutzer in einem Prozess"""
+
+    def __init__(
+        self,
+        users_dir: str = "users",
+        max_workers: int = 0,
+        requests_per_second: float = 2.0,
+        burst: float = 2.0,
+    ):
+        self.users_dir = Path(users_dir)
+        self.logger = Logger(
+            log_level=os.getenv("LOG_LEVEL", "INFO"),
+            log_dir=str(Path(os.getenv("LOG_DIR", "logs")) / "daemon"),
+            user="daemon",
+        )
+        self.checkers: Dict[str, GradeChecker] = {}
+
+        # Ein gemeinsames Rate-Limit für alle Requests zum HTW-Portal
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+
+        self._load_users()
+
+        if not self.checkers:
+            raise ValueError(f"Keine gültigen User-Configs in {self.users_dir}/")
+
+        self.max_workers = max_workers or min(32, len(self.checkers))
+
+        self.scheduler = StaggeredScheduler()
+
+        signal.signal(signal.SIGTERM, self._signal_handler)
+        signal.signal(signal.SIGINT, self._signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._reload_handler)
+
+    def _load_users(self):
+        """Erstellt pro users/*.env einen eigenen GradeChecker"""
+        for env_file in sorted(self.users_dir.glob("*.env")):
+            user = env_file.stem
+            try:
+                config = Config(env_file=str(env_file))
+                logger = Logger.from_config(
+                    config, user=user, log_dir=str(Path(config.log_dir) / user)
+                )
+                self.checkers[user] = GradeChecker(
+                    config, logger, handle_signals=False, rate_limiter=self.rate_limiter
+                )
+                self.logger.info("Benutzer geladen: {user}", user=user)
+            except ValueError as e:
+                self.logger.error(
+                    "Konfigurationsfehler in {env_file}: {error}",
+                    env_file=env_file,
+                    error=e,
+                )
+
+    def _signal_handler(self, signum, frame):
+        """Behandelt Shutdown-Signale"""
+        self.logger.info("Signal {signum} empfangen. Beende Daemon...", signum=signum)
+        self.scheduler.stop()
+
+    def _reload_handler(self, signum, frame):
+        """SIGHUP: alle Benutzer laden ihre .env vor der nächsten Prüfung neu"""
+        self.logger.info("SIGHUP empfangen - Konfigurationen werden neu geladen")
+        for checker in self.checkers.values():
+            checker.reload_requested = True
+
+    def check_now(self, user: str):
+        """Prüft einen Benutzer sofort (Steuerbefehl "check")"""
+        self.checkers[user].check_now()
+        self.scheduler.trigger(user)
+
+    def _check_user(self, user: str):
+        """Führt eine Prüfung aus und plant die nächste ein"""
+        checker = self.checkers[user]
+        interval = checker.config.poll_interval
+        try:
+            interval = checker.run_cycle()
+        except Exception as e:
+            checker.logger.error("Unerwarteter Fehler: {error}", error=e)
+        finally:
+            self.scheduler.reschedule(user, interval)
+
+    def run(self):
+        """Hauptschleife des Daemons"""
+        self.logger.info(
+            "Multi-User-Daemon gestartet: {users} Benutzer, "
+            "{workers} Worker, max. {rate:g} Requests/s",
+            users=len(self.checkers),
+            workers=self.max_workers,
+            rate=self.rate_limiter.rate,
+        )
+
+        for checker in self.checkers.values():
+            checker.startup()
+
+        # Prüfungen gleichmäßig über das Intervall verteilen statt alle auf einmal
+        self.scheduler.add_all(
+            list(self.checkers),
+            lambda user: self.checkers[user].config.poll_interval,
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="checker"
+        ) as pool:
+            while True:
+                user = self.scheduler.next_due()
+                if user is None:
+                    break
+                pool.submit(self._check_user, user)
+
+        for checker in self.checkers.values():
+            checker.shutdown()
+            checker.logger.close()
+
+        self.logger.info("Multi-User-Daemon beendet")
+        self.logger.close()
+
+
+def main():
+    """Haupteinstiegspunkt"""
+    try:
+        daemon = MultiUserDaemon(
+            users_dir=os.getenv("USERS_DIR", "users"),
+            max_workers=int(os.getenv("DAEMON_WORKERS", "0")),
+            requests_per_second=float(os.getenv("PORTAL_REQUESTS_PER_SECOND", "2")),
+            burst=float(os.getenv("PORTAL_BURST", "2")),
+        )
+        # Ein Endpunkt für alle Benutzer, unterschieden per Label "user"
+        metrics_port = int(os.getenv("METRICS_PORT", "0"))
+        if metrics_port:
+            metrics.start_metrics_server(metrics_port)
+            daemon.logger.info("Metriken unter :{port}/metrics", port=metrics_port)
+
+        control = None
+        if os.getenv("CONTROL_SOCKET"):
+            control = ControlServer(
+                os.getenv("CONTROL_SOCKET"),
+                daemon.checkers,
+                daemon.check_now,
+                daemon.logger,
+            ).start()
+
+        try:
+            daemon.run()
+        finally:
+            if control:
+                control.stop()
+    except Exception as e:
+        print(f"Kritischer Fehler beim Start: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
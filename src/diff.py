@@ -0,0 +1,90 @@
+"""
+Vergleich zweier Noten-Stände in linearer Zeit
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple
+
+from grades import Grade
+
+
+class GradeChange(NamedTuple):
+    """Geänderte Note eines Moduls"""
+
+    previous: Grade
+    current: Grade
+
+
+class GradeDiff:
+    """Ergebnis eines Noten-Vergleichs"""
+
+    def __init__(self):
+        self.added: List[Grade] = []
+        self.changed: List[GradeChange] = []
+        self.removed: List[Grade] = []
+
+    @property
+    def has_updates(self) -> bool:
+        """Neue oder geänderte Noten (meldepflichtig)"""
+        return bool(self.added or self.changed)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> str:
+        parts = []
+        if self.added:
+            parts.append(f"{len(self.added)} neu")
+        if self.changed:
+            parts.append(f"{len(self.changed)} geändert")
+        if self.removed:
+            parts.append(f"{len(self.removed)} entfernt")
+        return ", ".join(parts) or "keine Änderungen"
+
+
+def _group_by_module(grades: List[Grade]) -> Dict[str, List[Grade]]:
+    """Modul → Noten in Seiten-Reihenfolge (mehrere Versuche pro Modul möglich)"""
+    grouped = defaultdict(list)
+    for grade in grades:
+        grouped[grade.module].append(grade)
+    return grouped
+
+
+def diff_grades(previous: List[Grade], current: List[Grade]) -> GradeDiff:
+    """Vergleicht zwei Noten-Listen pro Modul in O(n + m)
+
+    Pro Modul werden gleiche Noten zuerst einander zugeordnet. Übrige neue
+    Noten ersetzen übrige alte Noten (geändert), der Rest ist neu bzw. entfernt.
+    """
+    result = GradeDiff()
+    previous_by_module = _group_by_module(previous)
+
+    for module, current_grades in _group_by_module(current).items():
+        previous_grades = previous_by_module.pop(module, [])
+        available = Counter(previous_grades)
+        unmatched = []
+
+        for grade in current_grades:
+            if available[grade]:
+                available[grade] -= 1
+            else:
+                unmatched.append(grade)
+
+        # Nicht wiedergefundene alte Noten, in ursprünglicher Reihenfolge
+        remaining_previous = []
+        for grade in previous_grades:
+            if available[grade]:
+                available[grade] -= 1
+                remaining_previous.append(grade)
+
+        for old_grade, new_grade in zip(remaining_previous, unmatched):
+            result.changed.append(GradeChange(old_grade, new_grade))
+
+        result.added.extend(unmatched[len(remaining_previous) :])
+        result.removed.extend(remaining_previous[len(unmatched) :])
+
+    # Module, die ganz verschwunden sind
+    for grades in previous_by_module.values():
+        result.removed.extend(grades)
+
+    return result
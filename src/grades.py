@@ -0,0 +1,52 @@
+"""
+Kompakte Noten-Einträge mit numerischer Note
+"""
+
+import sys
+from functools import lru_cache
+from typing import NamedTuple
+
+
+@lru_cache(maxsize=1024)
+def parse_grade(grade_text: str) -> int:
+    """Wandelt eine Note im Format "1,3" in Hundertstel (130) um
+
+    Gleiche Noten teilen sich dadurch auch dasselbe int-Objekt.
+    """
+    whole, _, fraction = grade_text.partition(",")
+    return int(whole) * 100 + int(fraction.ljust(2, "0")[:2])
+
+
+def format_grade(hundredths: int) -> str:
+    """Deutsche Darstellung einer Note (130 → "1,3", 105 → "1,05")"""
+    whole, fraction = divmod(hundredths, 100)
+    if fraction % 10 == 0:
+        return f"{whole},{fraction // 10}"
+    return f"{whole},{fraction:02d}"
+
+
+class Grade(NamedTuple):
+    """Ein Noten-Eintrag (Modul, Note in Hundertstel)"""
+
+    module: str
+    hundredths: int
+
+    @classmethod
+    def from_text(cls, grade_text: str, module: str) -> "Grade":
+        """Baut einen Eintrag aus den Texten der Portal-Seite"""
+        # Modulnamen wiederholen sich über alle Accounts - nur einmal im Speicher
+        return cls(sys.intern(module), parse_grade(grade_text))
+
+    @property
+    def text(self) -> str:
+        """Note in deutscher Darstellung ("1,3")"""
+        return format_grade(self.hundredths)
+
+    @property
+    def value(self) -> float:
+        """Note als Zahl (1.3)"""
+        return self.hundredths / 100
+
+    def __str__(self) -> str:
+        return f"{self.module}: {self.text}"
+
@@ -2,99 +2,257 @@
 Logging-Modul für HTW Noten-Checker
 """
 
+import atexit
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class LogEvent:
+    """Nachricht mit Feldern, wird erst beim Ausgeben eines Handlers formatiert"""
+
+    __slots__ = ("template", "fields")
+
+    def __init__(self, template: str, fields: Dict[str, Any]):
+        self.template = template
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return self.template.format(**self.fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """Ein JSON-Objekt pro Zeile, Felder strukturierter Nachrichten als Schlüssel"""
+
+    def __init__(self, user: Optional[str] = None):
+        super().__init__()
+        self.user = user
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "func": record.funcName,
+            "line": record.lineno,
+        }
+        if self.user:
+            entry["user"] = self.user
+        if isinstance(record.msg, LogEvent):
+            entry.update(record.msg.fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Reiht Records unformatiert ein, formatiert wird erst im Listener-Thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Komprimiert die rotierte Log-Datei"""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
 
 
 class Logger:
-    """Zentrale Logging-Klasse mit File- und Console-Output"""
+    """Zentrale Logging-Klasse mit File- und Console-Output
+
+    Im asynchronen Modus (Standard) reiht der aufrufende Thread nur den
+    Record in eine Queue ein; Formatierung und Schreiben übernimmt ein
+    QueueListener im Hintergrund.
+    """
 
-    def __init__(self, log_level: str = "INFO", log_dir: str = "logs"):
+    def __init__(
+        self,
+        log_level: str = "INFO",
+        log_dir: str = "logs",
+        user: Optional[str] = None,
+        async_logging: bool = True,
+        max_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 3,
+        compress: bool = False,
+        log_format: str = "text",
+    ):
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
 
-        # Logger setup
-        self.logger = logging.getLogger("htwd_grade_checker")
+        # Logger setup (eigener Logger pro Benutzer im Multi-User-Betrieb)
+        logger_name = f"htwd_grade_checker.{user}" if user else "htwd_grade_checker"
+        self.logger = logging.getLogger(logger_name)
         self.logger.setLevel(getattr(logging, log_level.upper()))
+        self.logger.propagate = False
 
         # Clear existing handlers
+        for handler in self.logger.handlers:
+            handler.close()
         self.logger.handlers.clear()
 
         # Console Handler
         console_handler = logging.StreamHandler(sys.stdout)
+        user_prefix = f"[{user}] " if user else ""
         console_formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            f"%(asctime)s - %(levelname)s - {user_prefix}%(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+        console_handler.setFormatter(
+            JsonFormatter(user) if log_format == "json" else console_formatter
         )
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
 
-        # File Handler
-        log_file = self.log_dir / "htwd_checker.log"
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        # Eine rotierende Log-Datei (optional mit gzip-komprimierten Backups)
+        file_handler = RotatingFileHandler(
+            self.log_dir / "htwd_checker.log",
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+        if compress:
+            file_handler.namer = _gzip_namer
+            file_handler.rotator = _gzip_rotator
         file_formatter = logging.Formatter(
             "%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S",
         )
-        file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
+        file_handler.setFormatter(
+            JsonFormatter(user) if log_format == "json" else file_formatter
+        )
 
-        # Rotating file handler für große Logs
-        from logging.handlers import RotatingFileHandler
+        handlers = [console_handler, file_handler]
+        self.listener = None
+        if async_logging:
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(_LazyQueueHandler(log_queue))
+            self.listener = QueueListener(log_queue, *handlers)
+            self.listener.start()
+            # Beim Beenden noch alle eingereihten Records schreiben
+            atexit.register(self.close)
+        else:
+            for handler in handlers:
+                self.logger.addHandler(handler)
+        self.handlers = handlers
 
-        rotating_handler = RotatingFileHandler(
-            self.log_dir / "htwd_checker_rotating.log",
-            maxBytes=5 * 1024 * 1024,  # 5MB
-            backupCount=3,
-            encoding="utf-8",
+    @classmethod
+    def from_config(
+        cls, config, user: Optional[str] = None, log_dir: Optional[str] = None
+    ) -> "Logger":
+        """Logger mit den LOG_*-Einstellungen einer Konfiguration"""
+        return cls(
+            log_level=config.log_level,
+            log_dir=log_dir or config.log_dir,
+            user=user,
+            async_logging=config.log_async,
+            max_bytes=config.log_max_bytes,
+            backup_count=config.log_backup_count,
+            compress=config.log_compress,
+            log_format=config.log_format,
         )
-        rotating_handler.setFormatter(file_formatter)
-        self.logger.addHandler(rotating_handler)
 
-    def debug(self, message: str):
-        """Debug-Level Logging"""
-        self.logger.debug(message)
+    def set_level(self, log_level: str):
+        """Ändert das Log-Level zur Laufzeit (z.B. nach einem Konfigurations-Reload)"""
+        self.logger.setLevel(getattr(logging, log_level.upper()))
+
+    def close(self):
+        """Schreibt ausstehende Records und schließt die Log-Datei"""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+            atexit.unregister(self.close)
+        for handler in self.handlers:
+            handler.close()
+
+    def _log(self, level: int, message: str, fields: Dict[str, Any]):
+        """Gibt nur aktivierte Level aus, Felder werden erst im Handler eingesetzt"""
+        if not self.logger.isEnabledFor(level):
+            return
+        if fields:
+            message = LogEvent(message, fields)
+        # stacklevel: Funktion und Zeile des Aufrufers statt dieses Moduls
+        self.logger.log(level, message, stacklevel=3)
 
-    def info(self, message: str):
+    def debug(self, message: str, **fields):
+        """Debug-Level Logging ("{feld}" im Text wird durch fields ersetzt)"""
+        self._log(logging.DEBUG, message, fields)
+
+    def info(self, message: str, **fields):
         """Info-Level Logging"""
-        self.logger.info(message)
+        self._log(logging.INFO, message, fields)
 
-    def warning(self, message: str):
+    def warning(self, message: str, **fields):
         """Warning-Level Logging"""
-        self.logger.warning(message)
+        self._log(logging.WARNING, message, fields)
 
-    def error(self, message: str):
+    def error(self, message: str, **fields):
         """Error-Level Logging"""
-        self.logger.error(message)
+        self._log(logging.ERROR, message, fields)
 
-    def critical(self, message: str):
+    def critical(self, message: str, **fields):
         """Critical-Level Logging"""
-        self.logger.critical(message)
+        self._log(logging.CRITICAL, message, fields)
 
     def log_grades(self, grades: list, title: str = "Aktuelle Noten"):
         """Spezielle Funktion zum Loggen von Noten"""
-        self.info(f"=== {title} ===")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        self._log(logging.INFO, "=== {title} ===", {"title": title})
         if not grades:
-            self.info("Keine Noten gefunden")
+            self._log(logging.INFO, "Keine Noten gefunden", {})
             return
 
-        for i, grade in enumerate(grades, 1):
-            self.info(f"{i}. {grade['module']}: {grade['grade']}")
-        self.info(f"=== Gesamt: {len(grades)} Noten ===")
+        for index, grade in enumerate(grades, 1):
+            self._log(
+                logging.INFO,
+                "{index}. {module}: {grade}",
+                {"index": index, "module": grade.module, "grade": grade.text},
+            )
+        self._log(logging.INFO, "=== Gesamt: {count} Noten ===", {"count": len(grades)})
 
     def log_request_debug(self, url: str, status_code: int, response_size: int = None):
         """Debug-Logging für HTTP-Requests"""
-        size_info = f", {response_size} bytes" if response_size else ""
-        self.debug(f"HTTP {status_code} - {url}{size_info}")
+        if response_size:
+            self._log(
+                logging.DEBUG,
+                "HTTP {status} - {url}, {bytes} bytes",
+                {"status": status_code, "url": url, "bytes": response_size},
+            )
+        else:
+            self._log(
+                logging.DEBUG,
+                "HTTP {status} - {url}",
+                {"status": status_code, "url": url},
+            )
 
     def log_notification_debug(
         self, service: str, success: bool, error_msg: str = None
     ):
         """Debug-Logging für Benachrichtigungen"""
         if success:
-            self.debug(f"Benachrichtigung via {service} erfolgreich gesendet")
+            self._log(
+                logging.DEBUG,
+                "Benachrichtigung via {service} erfolgreich gesendet",
+                {"service": service},
+            )
         else:
-            self.error(f"Benachrichtigung via {service} fehlgeschlagen: {error_msg}")
+            self._log(
+                logging.ERROR,
+                "Benachrichtigung via {service} fehlgeschlagen: {error}",
+                {"service": service, "error": error_msg},
+            )
 
     def log_startup_info(self, config):
         """Startup-Informationen loggen"""
@@ -10,35 +10,224 @@ License: MIT
 und sendet Benachrichtigungen über verschiedene Dienste.
 """
 
+import math
 import signal
 import sys
+import threading
 import time
 from datetime import datetime
 
+import metrics
 from config import Config
+from control import ControlServer
+from diff import GradeDiff, diff_grades
 from logger import Logger
 from notifications import NotificationManager
+from outbox import NotificationOutbox
 from scraper import HTWDScraper
+from state import GradeStateStore
+from tracing import NO_TRACE, CycleTrace, TraceWriter
+
+# Einstellungen, die beim Reload die Benachrichtigungsdienste neu aufbauen
+NOTIFICATION_SETTINGS = {
+    "pushbullet_enabled",
+    "pushbullet_token",
+    "telegram_enabled",
+    "telegram_bot_token",
+    "telegram_chat_id",
+}
+
+# Einstellungen, die beim Reload eine neue Anmeldung erfordern
+LOGIN_SETTINGS = {"htwd_url", "htwd_password"}
+
+# Einstellungen, die erst nach einem Neustart wirksam werden
+RESTART_SETTINGS = {
+    "htwd_username",
+    "log_dir",
+    "log_async",
+    "log_max_bytes",
+    "log_backup_count",
+    "log_compress",
+    "log_format",
+    "persist_state",
+    "state_file",
+    "notification_outbox",
+    "metrics_port",
+    "control_socket",
+    "trace_cycles",
+    "max_connections_per_host",
+}
 
 
 class GradeChecker:
-    def __init__(self):
-        self.config = Config()
-        self.logger = Logger()
-        self.scraper = HTWDScraper(self.config, self.logger)
+    def __init__(
+        self, config=None, logger=None, handle_signals: bool = True, rate_limiter=None
+    ):
+        self.config = config or Config()
+        self.logger = logger or Logger.from_config(self.config)
+        self.owns_logger = logger is None
+        self.scraper = HTWDScraper(self.config, self.logger, rate_limiter)
         self.notification_manager = NotificationManager(self.config, self.logger)
 
         self.running = True
+        self.reload_requested = False
+        self.paused = False
+        self.check_requested = False  # einmalige Prüfung auch wenn pausiert
+        # Weckt die wartende Hauptschleife (Signal, Steuerbefehl)
+        self.wakeup = threading.Event()
+
+        # Status für die Steuerung
+        self.checking = False
+        self.last_cycle_at = None
+        self.last_cycle_seconds = None
+        self.next_check_at = None
         self.previous_grades = []
+        self.initialized = False  # erster Noten-Stand gespeichert (auch 0 Noten)
+        self.trace = NO_TRACE  # Trace des laufenden Prüfzyklus
+        self.poll_interval = None  # zuletzt gewähltes (adaptives) Intervall
+
+        # Letzten Noten-Stand laden, damit ein Neustart keine Noten verschluckt
+        self.state_store = None
+        if self.config.persist_state:
+            self.state_store = GradeStateStore(
+                self.config.state_file, self.config.htwd_username
+            )
+            self.previous_grades = self.state_store.load()
+            self.initialized = self.state_store.initialized
+            if self.initialized:
+                self.logger.info(
+                    "Gespeicherter Zustand geladen: {count} Noten",
+                    count=len(self.previous_grades),
+                )
 
-        # Signal handlers für graceful shutdown
-        signal.signal(signal.SIGTERM, self._signal_handler)
-        signal.signal(signal.SIGINT, self._signal_handler)
+        # Noten-Benachrichtigungen über die persistente Outbox zustellen
+        self.outbox = None
+        if self.config.notification_outbox and self.notification_manager.services:
+            self.outbox = NotificationOutbox(
+                self.config.state_file,
+                self.config.htwd_username,
+                self.notification_manager,
+                self.logger,
+            )
+
+        # Ein JSON-Datensatz pro Prüfzyklus mit der Dauer jeder Phase
+        self.trace_writer = None
+        if self.config.trace_cycles:
+            self.trace_writer = TraceWriter(self.logger.log_dir / "trace.jsonl")
+
+        # Signal handlers für graceful shutdown (im Multi-User-Daemon zentral)
+        if handle_signals:
+            signal.signal(signal.SIGTERM, self._signal_handler)
+            signal.signal(signal.SIGINT, self._signal_handler)
+            if hasattr(signal, "SIGHUP"):
+                signal.signal(signal.SIGHUP, self._reload_handler)
 
     def _signal_handler(self, signum, frame):
         """Behandelt Shutdown-Signale"""
-        self.logger.info(f"Signal {signum} empfangen. Beende Anwendung...")
+        self.logger.info(
+            "Signal {signum} empfangen. Beende Anwendung...", signum=signum
+        )
         self.running = False
+        self.wakeup.set()
+
+    def _reload_handler(self, signum, frame):
+        """SIGHUP: Konfiguration neu laden und sofort prüfen"""
+        self.reload_requested = True
+        self.wakeup.set()
+
+    def check_now(self):
+        """Startet die nächste Prüfung sofort statt nach Ablauf des Intervalls"""
+        self.logger.info("Prüfung angefordert")
+        self.check_requested = True
+        self.wakeup.set()
+
+    def pause(self):
+        """Setzt die Prüfungen aus, bis resume() aufgerufen wird"""
+        if not self.paused:
+            self.paused = True
+            self.logger.info("Prüfungen pausiert")
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self.logger.info("Prüfungen fortgesetzt")
+
+    def status(self) -> dict:
+        """Aktueller Stand für die Steuerung"""
+        next_check = None
+        if self.next_check_at is not None:
+            next_check = max(0, round(self.next_check_at - time.time()))
+        return {
+            "user": self.config.htwd_username,
+            "paused": self.paused,
+            "checking": self.checking,
+            "last_cycle": (
+                self.last_cycle_at.isoformat(timespec="seconds")
+                if self.last_cycle_at
+                else None
+            ),
+            "last_cycle_seconds": (
+                round(self.last_cycle_seconds, 3)
+                if self.last_cycle_seconds is not None
+                else None
+            ),
+            "grades": len(self.previous_grades),
+            "next_check_in": next_check,
+            "outbox_pending": self.outbox.pending() if self.outbox else 0,
+        }
+
+    def reload_config_if_needed(self):
+        """Lädt die Konfiguration nach SIGHUP oder Änderung der Datei neu"""
+        if not (self.reload_requested or self.config.changed_on_disk()):
+            return
+        self.reload_requested = False
+
+        try:
+            changed = set(self.config.reload())
+        except (ValueError, OSError) as e:
+            self.logger.error(
+                "Konfiguration nicht neu geladen, bisheriger Stand bleibt aktiv: "
+                "{error}",
+                error=e,
+            )
+            return
+
+        if not changed:
+            self.logger.info("Konfiguration neu geladen: keine Änderungen")
+            return
+
+        self.logger.info(
+            "Konfiguration neu geladen: {settings}",
+            settings=", ".join(sorted(name.upper() for name in changed)),
+        )
+        self._apply_config_changes(changed)
+
+    def _apply_config_changes(self, changed: set):
+        """Übernimmt geänderte Einstellungen in die laufenden Komponenten"""
+        # Alle übrigen Werte werden bei jedem Zugriff aus dem Snapshot gelesen
+        if "log_level" in changed:
+            self.logger.set_level(self.config.log_level)
+
+        if "parser_backend" in changed:
+            self.scraper.configure_parser()
+
+        if changed & LOGIN_SETTINGS:
+            self.scraper.close()  # nächste Prüfung meldet sich neu an
+
+        if changed & NOTIFICATION_SETTINGS:
+            # Neue Dienste zuerst anlegen, damit geteilte Sessions offen bleiben
+            previous = self.notification_manager
+            self.notification_manager = NotificationManager(self.config, self.logger)
+            if self.outbox:
+                self.outbox.use_manager(self.notification_manager)
+            previous.close()
+
+        restart = changed & RESTART_SETTINGS
+        if restart:
+            self.logger.warning(
+                "Erst nach einem Neustart wirksam: {settings}",
+                settings=", ".join(sorted(name.upper() for name in restart)),
+            )
 
     def _is_active_time(self) -> bool:
         """Prüft ob aktuell aktive Zeit ist (06:00-22:00)"""
@@ -47,82 +236,255 @@ class GradeChecker:
         end_time = datetime.strptime("22:00", "%H:%M").time()
         return start_time <= now <= end_time
 
-    def _check_for_new_grades(self):
-        """Überprüft auf neue Noten"""
+    def _check_for_new_grades(self) -> bool:
+        """Überprüft auf neue Noten (True wenn neue Noten gefunden wurden)"""
         try:
             # Aktive Zeit prüfen
             if not self._is_active_time():
                 self.logger.info("Außerhalb der aktiven Zeit (06:00-22:00). Warte...")
-                return
+                return False
 
             # Noten abrufen
             current_grades = self.scraper.get_grades()
             if current_grades is None:
                 self.logger.warning("Konnte keine Noten abrufen")
-                return
+                return False
 
-            # Erste Ausführung
-            if not self.previous_grades:
+            # Unveränderte Noten-Seite: kein Vergleich nötig
+            if self.scraper.grades_unchanged and self.initialized:
+                self.logger.info(
+                    "Keine neuen Noten ({count} Noten total, Seite unverändert - "
+                    "{unchanged}/{fetches} Durchläufe übersprungen)",
+                    count=len(current_grades),
+                    unchanged=self.scraper.unchanged_count,
+                    fetches=self.scraper.fetch_count,
+                )
+                self.scraper.commit()
+                return False
+
+            # Erste Ausführung (nicht: bisher keine Noten)
+            if not self.initialized:
                 self.previous_grades = current_grades
+                self.initialized = True
+                self._save_state()
+                self.scraper.commit()
                 self.logger.info(
-                    f"Initialisierung: {len(current_grades)} Noten gefunden"
+                    "Initialisierung: {count} Noten gefunden", count=len(current_grades)
                 )
-                return
+                return False
 
-            # Neue Noten suchen
-            new_grades = self._find_new_grades(current_grades)
+            # Neue, geänderte und entfernte Noten ermitteln
+            with metrics.DIFF_SECONDS.time(user=self.config.htwd_username):
+                with self.trace.span("diff"):
+                    diff = diff_grades(self.previous_grades, current_grades)
 
-            if new_grades:
-                self.logger.info(f"{len(new_grades)} neue Note(n) gefunden!")
-                self._send_notifications(new_grades)
-                self.previous_grades = current_grades
-            else:
+            if diff.has_updates:
                 self.logger.info(
-                    f"Keine neuen Noten ({len(current_grades)} Noten total)"
+                    "Noten-Update gefunden: {summary}",
+                    summary=diff.summary(),
+                    added=len(diff.added),
+                    changed=len(diff.changed),
                 )
+                self._send_notifications(diff)
+                # Entfernte Noten behalten (siehe unten)
+                self.previous_grades = current_grades + diff.removed
+                self._save_state()
+
+            if diff.removed:
+                # Meist ein unvollständig geladener Notenspiegel - Stand behalten,
+                # damit die Noten beim nächsten Laden nicht erneut gemeldet werden
+                for grade in diff.removed:
+                    self.logger.warning(
+                        "Note nicht mehr gelistet: {module} ({grade})",
+                        module=grade.module,
+                        grade=grade.text,
+                    )
+            elif not diff.has_updates:
+                self.logger.info(
+                    "Keine neuen Noten ({count} Noten total)", count=len(current_grades)
+                )
+
+            # Erst jetzt gilt die Seite als verarbeitet - bei einem Fehler oben
+            # wird sie im nächsten Durchlauf erneut ausgewertet
+            self.scraper.commit()
+            return diff.has_updates
 
         except Exception as e:
-            self.logger.error(f"Fehler beim Überprüfen der Noten: {e}")
-
-    def _find_new_grades(self, current_grades: list) -> list:
-        """Findet neue Noten durch Vergleich mit vorherigen"""
-        new_grades = []
-
-        for grade in current_grades:
-            # Prüfe ob Note bereits in vorherigen Noten vorhanden
-            is_new = True
-            for prev_grade in self.previous_grades:
-                if (
-                    grade["module"] == prev_grade["module"]
-                    and grade["grade"] == prev_grade["grade"]
-                ):
-                    is_new = False
-                    break
-
-            if is_new:
-                new_grades.append(grade)
-
-        return new_grades
-
-    def _send_notifications(self, new_grades: list):
-        """Sendet Benachrichtigungen für neue Noten"""
-        # Allgemeine Benachrichtigung
-        self.notification_manager.send_notification(
-            "HTW Noten Update", f"{len(new_grades)} neue Note(n) verfügbar!"
+            self.logger.error("Fehler beim Überprüfen der Noten: {error}", error=e)
+
+        return False
+
+    def _save_state(self):
+        """Schreibt Änderungen am Noten-Stand in den persistenten Zustand"""
+        if not self.state_store:
+            return
+
+        try:
+            changes = self.state_store.save(self.previous_grades)
+            if changes:
+                self.logger.debug(
+                    "Zustand gespeichert: {changes} Änderung(en)", changes=changes
+                )
+        except Exception as e:
+            self.logger.error("Fehler beim Speichern des Zustands: {error}", error=e)
+
+    def _in_result_window(self) -> bool:
+        """Prüft ob heute in einem konfigurierten Ergebnis-Zeitraum liegt"""
+        today = datetime.now()
+        month_day = (today.month, today.day)
+        for start, end in self.config.result_windows:
+            if start <= end:
+                if start <= month_day <= end:
+                    return True
+            elif month_day >= start or month_day <= end:  # über den Jahreswechsel
+                return True
+        return False
+
+    def _next_poll_interval(self, changed: bool) -> int:
+        """Bestimmt das nächste Prüfintervall (fest oder adaptiv)"""
+        if not self.config.adaptive_polling:
+            return self.config.poll_interval
+
+        minimum = self.config.poll_interval_min
+        in_window = self._in_result_window()
+        # Im Ergebnis-Zeitraum höchstens das normale Intervall, sonst bis zum Maximum
+        ceiling = (
+            min(self.config.poll_interval, self.config.poll_interval_max)
+            if in_window
+            else self.config.poll_interval_max
         )
 
+        if changed:
+            interval, reason = minimum, "neue Noten gefunden"
+        elif self.poll_interval is None:
+            interval, reason = (
+                (minimum, "Ergebnis-Zeitraum")
+                if in_window
+                else (self.config.poll_interval, "Start")
+            )
+        else:
+            # Aufrunden, damit auch kleine Faktoren verlängern (round: 100 * 1.1)
+            interval = math.ceil(
+                round(self.poll_interval * self.config.poll_backoff_factor, 6)
+            )
+            reason = "keine Änderung, Ergebnis-Zeitraum" if in_window else "keine Änderung"
+
+        interval = max(minimum, min(interval, ceiling))
+
+        if interval != self.poll_interval:
+            self.logger.info(
+                "Prüfintervall: {interval}s ({reason}, Bereich {minimum}-{ceiling}s)",
+                interval=interval,
+                reason=reason,
+                minimum=minimum,
+                ceiling=ceiling,
+            )
+        else:
+            self.logger.debug(
+                "Prüfintervall bleibt {interval}s ({reason})",
+                interval=interval,
+                reason=reason,
+            )
+
+        self.poll_interval = interval
+        return interval
+
+    def run_cycle(self) -> int:
+        """Führt eine Prüfung aus und liefert das nächste Intervall in Sekunden"""
+        self.reload_config_if_needed()
+        requested, self.check_requested = self.check_requested, False
+        if self.paused and not requested:
+            self.logger.debug("Prüfungen pausiert - überspringe Durchlauf")
+            return self._schedule_next(self.config.poll_interval)
+
+        user = self.config.htwd_username
+        if self.trace_writer:
+            self.trace = self.scraper.trace = CycleTrace(user)
+
+        self.checking = True
+        self.last_cycle_at = datetime.now()
+        start = time.perf_counter()
+        try:
+            changed = self._check_for_new_grades()
+        finally:
+            self.checking = False
+            self.last_cycle_seconds = time.perf_counter() - start
+            metrics.CYCLE_SECONDS.observe(self.last_cycle_seconds, user=user)
+            if self.trace_writer:
+                self._write_trace()
+
+        metrics.CYCLES.inc(user=user)
+        return self._schedule_next(self._next_poll_interval(changed))
+
+    def _schedule_next(self, interval: int) -> int:
+        self.next_check_at = time.time() + interval
+        return interval
+
+    def _write_trace(self):
+        """Schreibt den Datensatz des Zyklus und beendet das Tracing"""
+        try:
+            self.trace_writer.write(self.trace)
+        except OSError as e:
+            self.logger.error("Fehler beim Schreiben des Traces: {error}", error=e)
+        self.trace = self.scraper.trace = NO_TRACE
+
+    def _notify(self, title: str, message: str):
+        """Stellt eine Noten-Benachrichtigung zu (über die Outbox wenn aktiviert)"""
+        if self.outbox:
+            # Zustellung läuft später im Outbox-Thread, hier nur das Einreihen
+            with self.trace.span("outbox_enqueue"):
+                self.outbox.enqueue(title, message)
+        else:
+            self.notification_manager.send_notification(title, message, self.trace)
+
+    def _send_notifications(self, diff: GradeDiff):
+        """Sendet Benachrichtigungen für neue und geänderte Noten"""
+        parts = []
+        if diff.added:
+            parts.append(f"{len(diff.added)} neue Note(n)")
+        if diff.changed:
+            parts.append(f"{len(diff.changed)} geänderte Note(n)")
+        summary = f"{' und '.join(parts)} verfügbar!"
+
+        # Alles in einer Nachricht pro Dienst (wenn aktiviert)
+        if self.config.post_individual_grades and self.config.batch_grades:
+            lines = [f"{grade.module}: {grade.text}" for grade in diff.added]
+            lines += [
+                f"{change.current.module}: {change.previous.text} → {change.current.text}"
+                for change in diff.changed
+            ]
+            self._notify("HTW Noten Update", "\n".join([summary, ""] + lines))
+            return
+
+        # Allgemeine Benachrichtigung
+        self._notify("HTW Noten Update", summary)
+
         # Einzelne Noten benachrichtigen (wenn aktiviert)
         if self.config.post_individual_grades:
-            for grade in new_grades:
-                self.notification_manager.send_notification(
-                    grade["module"], f"Note: {grade['grade']}"
+            for grade in diff.added:
+                self._notify(grade.module, f"Note: {grade.text}")
+            for change in diff.changed:
+                self._notify(
+                    change.current.module,
+                    f"Note geändert: {change.previous.text} → {change.current.text}",
                 )
 
-    def run(self):
-        """Hauptschleife der Anwendung"""
+    def startup(self):
+        """Startup-Logging und -Benachrichtigung"""
         self.logger.info("HTW Noten-Checker gestartet!")
-        self.logger.info(f"Benutzer: {self.config.htwd_username}")
-        self.logger.info(f"Prüfintervall: {self.config.poll_interval} Sekunden")
+        self.logger.info("Benutzer: {user}", user=self.config.htwd_username)
+        self.logger.info(
+            "Prüfintervall: {interval} Sekunden", interval=self.config.poll_interval
+        )
+        if self.config.adaptive_polling:
+            self.logger.info(
+                "Adaptives Prüfintervall: {minimum}-{maximum} Sekunden",
+                minimum=self.config.poll_interval_min,
+                maximum=self.config.poll_interval_max,
+            )
+
+        if self.outbox:
+            self.outbox.start()
 
         # Startup-Benachrichtigung
         self.notification_manager.send_notification(
@@ -130,32 +492,66 @@ class GradeChecker:
             f"Checker für {self.config.htwd_username} gestartet um {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}",
         )
 
+    def shutdown(self):
+        """Gibt Ressourcen frei"""
+        self.running = False
+        self.scraper.close()
+        if self.outbox:
+            self.outbox.close()
+        self.notification_manager.close()
+        if self.state_store:
+            self.state_store.close()
+        self.logger.info("HTW Noten-Checker beendet")
+        if self.owns_logger:
+            self.logger.close()
+
+    def run(self):
+        """Hauptschleife der Anwendung"""
+        self.startup()
+
         # Hauptschleife
         while self.running:
             try:
-                self._check_for_new_grades()
+                self.wakeup.clear()
+                interval = self.run_cycle()
 
-                # Warten mit Interruption-Check
-                for _ in range(self.config.poll_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Schlafen bis zur nächsten Prüfung, Signal oder Steuerbefehl
+                self.wakeup.wait(interval)
 
             except KeyboardInterrupt:
                 self.logger.info("Benutzer-Interrupt empfangen")
                 break
             except Exception as e:
-                self.logger.error(f"Unerwarteter Fehler: {e}")
-                time.sleep(60)  # Warte eine Minute bei Fehlern
+                self.logger.error("Unerwarteter Fehler: {error}", error=e)
+                self.wakeup.wait(60)  # Warte eine Minute bei Fehlern
 
-        self.logger.info("HTW Noten-Checker beendet")
+        self.shutdown()
 
 
 def main():
     """Haupteinstiegspunkt"""
     try:
         checker = GradeChecker()
-        checker.run()
+        if checker.config.metrics_port:
+            metrics.start_metrics_server(checker.config.metrics_port)
+            checker.logger.info(
+                "Metriken unter :{port}/metrics", port=checker.config.metrics_port
+            )
+
+        control = None
+        if checker.config.control_socket:
+            control = ControlServer(
+                checker.config.control_socket,
+                {checker.config.htwd_username: checker},
+                lambda user: checker.check_now(),
+                checker.logger,
+            ).start()
+
+        try:
+            checker.run()
+        finally:
+            if control:
+                control.stop()
     except Exception as e:
         print(f"Kritischer Fehler beim Start: {e}")
         sys.exit(1)
@@ -0,0 +1,214 @@
+"""
+Metriken im Prometheus-Textformat (ohne zusätzliche Abhängigkeit)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+# Sekunden, passend für Portal-Requests bis Benachrichtigungs-Timeouts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Basis für Metriken mit Labels"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: List[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self.lock:
+            lines += self._samples()
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monoton steigender Zähler"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: List[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+            for key, value in self.values.items()
+        ]
+
+
+class Histogram(Metric):
+    """Verteilung von Dauern in festen Buckets"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: List[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Tuple[str, ...], list] = {}  # [Bucket-Zähler..., Summe]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            data = self.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[index] += 1
+            data[-2] += 1  # +Inf
+            data[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Misst die Dauer des with-Blocks"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, data in self.values.items():
+            bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, data):
+                labels = _format_labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {data[-1]:g}")
+            lines.append(f"{self.name}_count{labels} {data[-2]}")
+        return lines
+
+
+class Registry:
+    """Alle Metriken eines Prozesses"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Dauer der einzelnen Phasen eines Prüfzyklus
+LOGIN_SECONDS = REGISTRY.register(
+    Histogram("htwd_login_seconds", "Dauer des Logins (inkl. Login-Seite)", ["user"])
+)
+FETCH_SECONDS = REGISTRY.register(
+    Histogram("htwd_fetch_seconds", "Dauer des Abrufs der Noten-Seite", ["user"])
+)
+PARSE_SECONDS = REGISTRY.register(
+    Histogram("htwd_parse_seconds", "Dauer der Analyse einer Portal-Antwort", ["user"])
+)
+DIFF_SECONDS = REGISTRY.register(
+    Histogram("htwd_diff_seconds", "Dauer des Noten-Vergleichs", ["user"])
+)
+NOTIFICATION_SECONDS = REGISTRY.register(
+    Histogram(
+        "htwd_notification_seconds",
+        "Dauer einer Benachrichtigung pro Dienst",
+        ["user", "service"],
+    )
+)
+CYCLE_SECONDS = REGISTRY.register(
+    Histogram("htwd_cycle_seconds", "Dauer eines kompletten Prüfzyklus", ["user"])
+)
+
+# Zähler
+CYCLES = REGISTRY.register(
+    Counter("htwd_cycles_total", "Ausgeführte Prüfzyklen", ["user"])
+)
+LOGIN_FAILURES = REGISTRY.register(
+    Counter("htwd_login_failures_total", "Fehlgeschlagene Logins", ["user"])
+)
+RETRIES = REGISTRY.register(
+    Counter("htwd_retries_total", "Wiederholte Requests zum Portal", ["user"])
+)
+PARSE_WARNINGS = REGISTRY.register(
+    Counter(
+        "htwd_parse_warnings_total",
+        "Noten-Seiten ohne Noten-Elemente (mögliche Layout-Änderung)",
+        ["user"],
+    )
+)
+NOTIFICATIONS = REGISTRY.register(
+    Counter(
+        "htwd_notifications_total",
+        "Gesendete Benachrichtigungen pro Dienst und Ergebnis",
+        ["user", "service", "result"],
+    )
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Startet den /metrics-Endpunkt in einem Hintergrund-Thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    return server
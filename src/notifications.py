@@ -3,25 +3,139 @@ Benachrichtigungsmanager für verschiedene Dienste
 """
 
 import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from telegram_dispatcher import RateLimited, get_dispatcher
+from tracing import NO_TRACE
+
+# Keep-Alive-Sessions pro Dienst, im Prozess von allen Benutzern geteilt
+_sessions: Dict[str, requests.Session] = {}
+_session_users: Dict[str, int] = {}
+_sessions_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    """Session mit Connection-Pool und Retry bei Server-Fehlern"""
+    # Kompatibilität für verschiedene urllib3 Versionen
+    try:
+        retry_strategy = Retry(
+            total=3,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["POST"],
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+    except TypeError:
+        # Fallback für ältere urllib3 Versionen
+        retry_strategy = Retry(
+            total=3,
+            status_forcelist=[500, 502, 503, 504],
+            method_whitelist=["POST"],
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+
+    adapter = HTTPAdapter(pool_maxsize=10, max_retries=retry_strategy)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def acquire_session(name: str) -> requests.Session:
+    """Liefert die gemeinsame Session eines Dienstes (legt sie bei Bedarf an)"""
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = _create_session()
+            _session_users[name] = 0
+        _session_users[name] += 1
+        return _sessions[name]
+
+
+def release_session(name: str):
+    """Gibt die Session frei, der letzte Benutzer schließt sie"""
+    with _sessions_lock:
+        if name not in _sessions:
+            return
+        _session_users[name] -= 1
+        if _session_users[name] <= 0:
+            _sessions.pop(name).close()
+            del _session_users[name]
 
 
 class NotificationService:
     """Basis-Klasse für Benachrichtigungsdienste"""
 
+    name = "Service"
+
+    # Maximale Zeichen pro Nachricht (None = unbegrenzt)
+    max_message_length: Optional[int] = None
+
+    # Nachrichten pro Sekunde bei der Zustellung aus der Outbox
+    messages_per_second = 1.0
+
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
+        self.session = acquire_session(self.name)
 
     def send(self, title: str, message: str) -> bool:
         """Sendet Benachrichtigung - muss von Subklassen implementiert werden"""
         raise NotImplementedError
 
+    def format_message(self, title: str, message: str) -> str:
+        """Vollständiger Nachrichtentext, wie er beim Dienst ankommt"""
+        return f"{title}\n{message}"
+
+    def split_message(self, title: str, message: str) -> List[str]:
+        """Teilt eine zu lange Nachricht an Zeilengrenzen in mehrere Teile"""
+        if self.max_message_length is None:
+            return [message]
+
+        limit = self.max_message_length - len(self.format_message(title, ""))
+        if len(message) <= limit:
+            return [message]
+
+        parts, current = [], ""
+        for line in message.split("\n"):
+            # Einzelne überlange Zeilen hart umbrechen
+            while len(line) > limit:
+                if current:
+                    parts.append(current)
+                    current = ""
+                parts.append(line[:limit])
+                line = line[limit:]
+
+            candidate = f"{current}\n{line}" if current else line
+            if len(candidate) > limit:
+                parts.append(current)
+                candidate = line
+            current = candidate
+
+        if current:
+            parts.append(current)
+        return parts
+
+    def close(self):
+        """Gibt die gemeinsame Session frei"""
+        if self.session:
+            release_session(self.name)
+            self.session = None
+
 
 class PushbulletService(NotificationService):
     """Pushbullet-Benachrichtigungsdienst"""
 
+    name = "Pushbullet"
+
     API_URL = "https://api.pushbullet.com/v2/pushes"
 
     def send(self, title: str, message: str) -> bool:
@@ -38,7 +152,7 @@ class PushbulletService(NotificationService):
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(
+            response = self.session.post(
                 self.API_URL, data=json.dumps(data), headers=headers, timeout=10
             )
 
@@ -73,9 +187,16 @@ class PushbulletService(NotificationService):
 class TelegramService(NotificationService):
     """Telegram-Bot-Benachrichtigungsdienst"""
 
+    name = "Telegram"
+    max_message_length = 4096
+
     def __init__(self, config, logger):
         super().__init__(config, logger)
-        self.api_url = f"https://api.telegram.org/bot{config.telegram_bot_token}"
+        # Alle Benutzer mit demselben Bot teilen sich dessen Rate-Limits
+        self.dispatcher = get_dispatcher(config.telegram_bot_token)
+
+    def format_message(self, title: str, message: str) -> str:
+        return f"*{title}*\n{message}"
 
     def send(self, title: str, message: str) -> bool:
         """Sendet Telegram-Benachrichtigung"""
@@ -85,18 +206,11 @@ class TelegramService(NotificationService):
                 return False
 
             # Nachricht formatieren
-            full_message = f"*{title}*\n{message}"
-
-            # URL für Telegram API
-            url = f"{self.api_url}/sendMessage"
+            full_message = self.format_message(title, message)
 
-            data = {
-                "chat_id": self.config.telegram_chat_id,
-                "text": full_message,
-                "parse_mode": "Markdown",
-            }
-
-            response = requests.post(url, data=data, timeout=10)
+            response = self.dispatcher.send_message(
+                self.session, self.config.telegram_chat_id, full_message
+            )
 
             if response.status_code == 200:
                 result = response.json()
@@ -113,6 +227,9 @@ class TelegramService(NotificationService):
                 )
                 return False
 
+        except RateLimited as e:
+            self.logger.log_notification_debug("Telegram", False, str(e))
+            return False
         except requests.exceptions.Timeout:
             self.logger.log_notification_debug("Telegram", False, "Timeout")
             return False
@@ -144,32 +261,123 @@ class NotificationManager:
         if not self.services:
             self.logger.warning("Keine Benachrichtigungsdienste aktiviert!")
 
-    def send_notification(self, title: str, message: str) -> bool:
+        # Eigener Thread pro Dienst: ein hängender Dienst blockiert die anderen
+        # auch bei folgenden Benachrichtigungen nicht
+        self.executors = {
+            service.name: ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"notify-{service.name.lower()}"
+            )
+            for service in self.services
+        }
+
+    def _send_to(
+        self,
+        service: NotificationService,
+        title: str,
+        message: str,
+        trace=NO_TRACE,
+        first_part: int = 0,
+        on_part: Optional[Callable[[int], None]] = None,
+    ) -> bool:
+        """Sendet über einen Dienst, Fehler zählen als nicht zugestellt
+
+        Ab first_part werden die Teile der Reihe nach gesendet, on_part erhält
+        nach jedem zugestellten Teil die Anzahl bisher zugestellter Teile.
+        """
+        start = time.perf_counter()
+        with trace.span("notify", service=service.name) as span:
+            try:
+                # Nur wenn das Nachrichtenlimit des Dienstes es erfordert, in Teilen
+                parts = service.split_message(title, message)
+                span["parts"] = len(parts) - first_part
+                success = True
+                for index in range(first_part, len(parts)):
+                    if not service.send(title, parts[index]):
+                        success = False
+                        break
+                    if on_part:
+                        on_part(index + 1)
+            except Exception as e:
+                self.logger.error(
+                    "Fehler bei {service}: {error}", service=service.name, error=e
+                )
+                success = False
+            span["ok"] = success
+
+        labels = {"user": self.config.htwd_username, "service": service.name}
+        metrics.NOTIFICATION_SECONDS.observe(time.perf_counter() - start, **labels)
+        metrics.NOTIFICATIONS.inc(result="ok" if success else "error", **labels)
+        return success
+
+    def submit(self, service: NotificationService, func, *args) -> Future:
+        """Führt func im Sende-Thread des Dienstes aus (Reihenfolge pro Dienst)"""
+        return self.executors[service.name].submit(func, *args)
+
+    def deliver(
+        self,
+        service: NotificationService,
+        title: str,
+        message: str,
+        first_part: int = 0,
+        on_part: Optional[Callable[[int], None]] = None,
+    ) -> bool:
+        """Sendet direkt über einen Dienst (blockierend, z.B. aus der Outbox)"""
+        return self._send_to(
+            service, title, message, first_part=first_part, on_part=on_part
+        )
+
+    def send_all(self, title: str, message: str, trace=NO_TRACE) -> Dict[str, bool]:
+        """Sendet parallel an alle Dienste, liefert das Ergebnis pro Dienst
+
+        Dienste, die bis NOTIFICATION_TIMEOUT nicht fertig sind, zählen als
+        fehlgeschlagen.
+        """
+        futures = {
+            self.executors[service.name].submit(
+                self._send_to, service, title, message, trace
+            ): service
+            for service in self.services
+        }
+        done, pending = wait(futures, timeout=self.config.notification_timeout)
+
+        results = {}
+        for future, service in futures.items():
+            if future in done:
+                results[service.name] = future.result()
+            else:
+                future.cancel()
+                self.logger.log_notification_debug(
+                    service.name,
+                    False,
+                    f"Zeitlimit von {self.config.notification_timeout:g}s überschritten",
+                )
+                results[service.name] = False
+
+        return results
+
+    def send_notification(self, title: str, message: str, trace=NO_TRACE) -> bool:
         """Sendet Benachrichtigung über alle aktivierten Dienste"""
         if not self.services:
             self.logger.warning("Keine Benachrichtigungsdienste verfügbar")
             return False
 
-        success_count = 0
-
-        for service in self.services:
-            try:
-                if service.send(title, message):
-                    success_count += 1
-            except Exception as e:
-                service_name = service.__class__.__name__
-                self.logger.error(f"Fehler bei {service_name}: {e}")
+        results = self.send_all(title, message, trace)
+        success_count = sum(results.values())
 
         # Erfolgreich wenn mindestens ein Service funktioniert hat
         success = success_count > 0
 
         if success:
             self.logger.info(
-                f"Benachrichtigung gesendet: '{title}' ({success_count}/{len(self.services)} Services)"
+                "Benachrichtigung gesendet: '{title}' ({sent}/{total} Services)",
+                title=title,
+                sent=success_count,
+                total=len(self.services),
             )
         else:
             self.logger.error(
-                f"Alle Benachrichtigungsdienste fehlgeschlagen für: '{title}'"
+                "Alle Benachrichtigungsdienste fehlgeschlagen für: '{title}'",
+                title=title,
             )
 
         return success
@@ -182,3 +390,12 @@ class NotificationManager:
         test_message = "Dies ist eine Test-Benachrichtigung"
 
         return self.send_notification(test_title, test_message)
+
+    def close(self):
+        """Beendet die Sende-Threads und gibt die HTTP-Sessions frei"""
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.executors = {}
+
+        for service in self.services:
+            service.close()
@@ -0,0 +1,330 @@
+"""
+Persistente Warteschlange für Benachrichtigungen (SQLite) mit Hintergrund-Zustellung
+"""
+
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from scheduler import TokenBucket
+
+# Wartezeit nach Fehlschlägen: 30s, 60s, 120s, ... höchstens eine Stunde
+RETRY_BASE = 30
+RETRY_MAX = 3600
+
+# Spätestens nach dieser Zeit wird die Warteschlange erneut geprüft
+IDLE_WAIT = 60
+
+
+class NotificationOutbox:
+    """Speichert ausgehende Benachrichtigungen pro Dienst bis zur Zustellung
+
+    Jede Benachrichtigung wird pro Dienst einzeln gespeichert, damit ein
+    fehlgeschlagener Dienst erneut versucht wird, ohne die anderen doppelt
+    zu benachrichtigen. Offene Einträge überstehen Neustarts. Jeder Dienst
+    wird im eigenen Sende-Thread des NotificationManagers abgearbeitet, ein
+    langsamer Dienst verzögert die anderen nicht.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            service TEXT NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            parts_sent INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+    def __init__(self, path: str, user: str, notification_manager, logger):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.user = user
+        self.notification_manager = notification_manager
+        self.logger = logger
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(self.SCHEMA)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (user, next_attempt)"
+        )
+        self.connection.commit()
+
+        # Rate-Limit pro Dienst (Nachrichten pro Sekunde)
+        self.rate_limiters: Dict[str, TokenBucket] = {
+            service.name: TokenBucket(service.messages_per_second)
+            for service in notification_manager.services
+        }
+
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.worker: Optional[threading.Thread] = None
+        # Dienste, deren Einträge gerade zugestellt werden
+        self.draining: Set[str] = set()
+        # Threads, die die Verbindung nutzen (Worker, Zustellungen); der letzte
+        # schließt sie, falls close() nicht auf ihn warten konnte
+        self.busy = 0
+        self.close_on_exit = False
+
+    def use_manager(self, notification_manager):
+        """Stellt künftig über einen neuen NotificationManager zu (Konfig-Reload)"""
+        for service in notification_manager.services:
+            if service.name not in self.rate_limiters:
+                self.rate_limiters[service.name] = TokenBucket(
+                    service.messages_per_second
+                )
+        self.notification_manager = notification_manager
+        self.wakeup.set()
+
+    def enqueue(self, title: str, message: str) -> int:
+        """Legt eine Benachrichtigung für alle aktivierten Dienste ab"""
+        rows = [
+            (self.user, service.name, title, message)
+            for service in self.notification_manager.services
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO outbox (user, service, title, message) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+        self.wakeup.set()
+        return len(rows)
+
+    def pending(self) -> int:
+        """Anzahl noch nicht zugestellter Einträge"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM outbox WHERE user = ?", (self.user,)
+            ).fetchone()[0]
+
+    def start(self):
+        """Startet die Zustellung im Hintergrund"""
+        if self.worker:
+            return
+
+        pending = self.pending()
+        if pending:
+            self.logger.info(
+                "Outbox: {pending} offene Benachrichtigung(en) übernommen",
+                pending=pending,
+            )
+
+        self.stopping.clear()
+        self._enter()
+        self.worker = threading.Thread(
+            target=self._run, name=f"outbox-{self.user}", daemon=True
+        )
+        self.worker.start()
+
+    def _run(self):
+        try:
+            while not self.stopping.is_set():
+                # Vor der Zustellung zurücksetzen, damit kein enqueue() verloren geht
+                self.wakeup.clear()
+                try:
+                    wait = self.deliver_due()
+                except Exception as e:
+                    self.logger.error(
+                        "Outbox: Fehler bei der Zustellung: {error}", error=e
+                    )
+                    wait = IDLE_WAIT
+
+                self.wakeup.wait(wait)
+        finally:
+            self._leave()
+
+    def _enter(self):
+        with self.lock:
+            self.busy += 1
+
+    def _leave(self):
+        with self.lock:
+            self.busy -= 1
+            if self.busy == 0 and self.close_on_exit:
+                self.connection.close()
+
+    def deliver_due(self) -> float:
+        """Stellt fällige Einträge zu, liefert die Wartezeit bis zum nächsten
+
+        Jeder Dienst wird parallel im eigenen Sende-Thread abgearbeitet. Auf
+        langsame Dienste wird höchstens NOTIFICATION_TIMEOUT gewartet, ihre
+        Zustellung läuft im Hintergrund weiter.
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, service, title, message, parts_sent, attempts FROM outbox "
+                "WHERE user = ? AND next_attempt <= ? ORDER BY id",
+                (self.user, now),
+            ).fetchall()
+
+        by_service = defaultdict(list)
+        for row in rows:
+            by_service[row[1]].append(row)
+
+        manager = self.notification_manager
+        services = {service.name: service for service in manager.services}
+        futures = {}
+
+        for service_name, service_rows in by_service.items():
+            service = services.get(service_name)
+            if service is None:
+                for row_id, _, title, *_ in service_rows:
+                    self.logger.warning(
+                        "Outbox: {service} nicht mehr aktiviert - verwerfe '{title}'",
+                        service=service_name,
+                        title=title,
+                    )
+                    self._delete(row_id)
+                continue
+
+            with self.lock:
+                if self.stopping.is_set() or service_name in self.draining:
+                    continue
+                self.draining.add(service_name)
+                self.busy += 1
+
+            try:
+                future = manager.submit(service, self._drain, service, service_rows)
+            except (KeyError, RuntimeError):  # Manager ersetzt (Konfig-Reload)
+                self._drained(service_name)
+                continue
+            # Auch bei abgebrochenen Aufträgen (Manager geschlossen) freigeben
+            future.add_done_callback(lambda _, name=service_name: self._drained(name))
+            futures[future] = service_name
+
+        if futures:
+            _, pending = wait(futures, timeout=manager.config.notification_timeout)
+            for future in pending:
+                self.logger.warning(
+                    "Outbox: {service} nach {timeout:g}s nicht fertig - "
+                    "Zustellung läuft im Hintergrund weiter",
+                    service=futures[future],
+                    timeout=manager.config.notification_timeout,
+                )
+
+        return self._next_wait()
+
+    def _drained(self, service_name: str):
+        """Zustellung eines Dienstes beendet, Worker prüft erneut"""
+        with self.lock:
+            self.draining.discard(service_name)
+        self._leave()
+        self.wakeup.set()
+
+    def _drain(self, service, rows: List[tuple]):
+        """Stellt die Einträge eines Dienstes der Reihe nach zu"""
+        try:
+            for row_id, service_name, title, message, parts_sent, attempts in rows:
+                if self.stopping.is_set():
+                    return
+
+                # Bereits zugestellte Teile einer geteilten Nachricht nicht wiederholen
+                self.rate_limiters[service_name].acquire()
+                if self.notification_manager.deliver(
+                    service,
+                    title,
+                    message,
+                    first_part=parts_sent,
+                    on_part=lambda count, row_id=row_id: self._mark_sent(row_id, count),
+                ):
+                    self._delete(row_id)
+                    self.logger.debug(
+                        "Outbox: '{title}' via {service} zugestellt",
+                        title=title,
+                        service=service_name,
+                    )
+                else:
+                    # Reihenfolge pro Dienst beibehalten: nach einem Fehler nicht weiter
+                    self._retry_later(row_id, service_name, title, attempts + 1)
+                    return
+        except Exception as e:
+            self.logger.error(
+                "Outbox: Fehler bei der Zustellung via {service}: {error}",
+                service=service.name,
+                error=e,
+            )
+
+    def _mark_sent(self, row_id: int, parts_sent: int):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE outbox SET parts_sent = ? WHERE id = ?", (parts_sent, row_id)
+            )
+
+    def _delete(self, row_id: int):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+
+    def _retry_later(
+        self, row_id: int, service_name: str, title: str, attempts: int
+    ):
+        """Exponentielles Backoff bis zur nächsten Zustellung"""
+        delay = min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+        next_attempt = time.time() + delay
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                (attempts, next_attempt, row_id),
+            )
+            # Spätere Einträge desselben Dienstes warten mit
+            self.connection.execute(
+                "UPDATE outbox SET next_attempt = ? "
+                "WHERE user = ? AND service = ? AND next_attempt < ?",
+                (next_attempt, self.user, service_name, next_attempt),
+            )
+        self.logger.warning(
+            "Outbox: '{title}' via {service} fehlgeschlagen "
+            "(Versuch {attempts}) - nächster Versuch in {delay}s",
+            title=title,
+            service=service_name,
+            attempts=attempts,
+            delay=delay,
+        )
+
+    def _next_wait(self) -> float:
+        # Dienste in Zustellung melden sich beim Abschluss selbst (wakeup)
+        with self.lock:
+            draining = sorted(self.draining)
+            next_attempt = self.connection.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE user = ? "
+                f"AND service NOT IN ({', '.join('?' * len(draining))})",
+                (self.user, *draining),
+            ).fetchone()[0]
+
+        if next_attempt is None:
+            return IDLE_WAIT
+        return min(max(next_attempt - time.time(), 0), IDLE_WAIT)
+
+    def close(self, timeout: float = 5):
+        """Beendet die Zustellung, offene Einträge bleiben gespeichert"""
+        self.stopping.set()
+        self.wakeup.set()
+        if self.worker:
+            self.worker.join(timeout)
+            self.worker = None
+
+        with self.lock:
+            if self.busy:
+                # Zustellung hängt noch (z.B. Netzwerk) - der letzte Thread schließt
+                self.close_on_exit = True
+                self.logger.warning(
+                    "Outbox: Zustellung läuft noch - "
+                    "Verbindung wird danach geschlossen"
+                )
+                return
+            self.connection.close()
@@ -0,0 +1,302 @@
+"""
+HTML-Parser-Backends für das HTW Noten-Portal
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from grades import Grade
+
+# Nur numerische Noten (Format: X,X)
+GRADE_PATTERN = re.compile(r"^\d+,\d+$")
+
+# CSS-Klassen eines Noten-Eintrags
+GRADE_CLASSES = (
+    "align-items-baseline",
+    "collapsed",
+    "list-group-item",
+    "list-group-custom-item",
+)
+GRADE_SELECTOR = "." + ".".join(GRADE_CLASSES)
+
+
+class GradeParser:
+    """Basis-Klasse für Parser-Backends"""
+
+    name = "base"
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def parse_document(
+        self, html_content: str, form: bool = True, grades: bool = True
+    ) -> Tuple[Optional[Dict[str, str]], Optional[List[Grade]]]:
+        """Baut den Baum einmal auf und liefert (Formular-Daten, Noten)"""
+        tree = self._build_tree(html_content, form, grades)
+        return (
+            self._form_from_tree(tree) if form else None,
+            self._grades_from_tree(tree) if grades else None,
+        )
+
+    def parse_grades(self, html_content: str) -> Optional[List[Grade]]:
+        """Liefert Noten oder None wenn keine Noten-Elemente gefunden wurden"""
+        return self.parse_document(html_content, form=False)[1]
+
+    def extract_form_data(self, html_content: str) -> Optional[Dict[str, str]]:
+        """Liefert versteckte Formular-Felder oder None wenn kein Formular existiert"""
+        return self.parse_document(html_content, grades=False)[0]
+
+    def _build_tree(self, html_content: str, form: bool, grades: bool):
+        raise NotImplementedError
+
+    def _form_from_tree(self, tree) -> Optional[Dict[str, str]]:
+        raise NotImplementedError
+
+    def _grades_from_tree(self, tree) -> Optional[List[Grade]]:
+        raise NotImplementedError
+
+    def _build_grade(self, grade_text: str, module_text: str) -> Optional[Grade]:
+        """Baut einen Noten-Eintrag, nicht-numerische Noten werden verworfen"""
+        if not GRADE_PATTERN.match(grade_text):
+            return None
+        return Grade.from_text(grade_text, module_text)
+
+
+class SoupParser(GradeParser):
+    """BeautifulSoup-Backend (html.parser), baut nur die Noten-Teilbäume auf"""
+
+    name = "html.parser"
+
+    # Nur Noten-Einträge bzw. Formular-Elemente in den Baum übernehmen
+    GRADE_STRAINER = SoupStrainer(
+        class_=re.compile(r"(^|\s)list-group-custom-item(\s|$)")
+    )
+    FORM_STRAINER = SoupStrainer(["form", "input"])
+
+    def _build_tree(self, html_content: str, form: bool, grades: bool):
+        # Formular und Noten zusammen: ganzes Dokument, aber nur einmal
+        strainer = None
+        if not (form and grades):
+            strainer = self.FORM_STRAINER if form else self.GRADE_STRAINER
+        return BeautifulSoup(html_content, "html.parser", parse_only=strainer)
+
+    def _grades_from_tree(self, tree) -> Optional[List[Grade]]:
+        grade_elements = tree.select(GRADE_SELECTOR)
+
+        if not grade_elements:
+            return None
+
+        grades = []
+        for element in grade_elements:
+            try:
+                # Note extrahieren
+                grade_span = element.select_one("span")
+                if not grade_span:
+                    continue
+
+                # Modul extrahieren
+                module_element = element.select_one("div > h4")
+                if not module_element:
+                    continue
+
+                grade = self._build_grade(
+                    grade_span.get_text(strip=True),
+                    module_element.get_text(strip=True),
+                )
+                if grade:
+                    grades.append(grade)
+
+            except Exception as e:
+                self.logger.warning(
+                    "Fehler beim Parsen eines Noten-Elements: {error}", error=e
+                )
+                continue
+
+        return grades
+
+    def _form_from_tree(self, tree) -> Optional[Dict[str, str]]:
+        if not tree.find("form"):
+            return None
+
+        form_data = {}
+        for input_field in tree.find_all("input", type="hidden"):
+            name = input_field.get("name")
+            if name:
+                form_data[name] = input_field.get("value", "")
+
+        return form_data
+
+
+class LxmlParser(GradeParser):
+    """Natives lxml-Backend mit XPath statt CSS-Selektoren"""
+
+    name = "lxml"
+
+    GRADE_XPATH = "//*[{}]".format(
+        " and ".join(
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+            for cls in GRADE_CLASSES
+        )
+    )
+
+    def __init__(self, logger):
+        super().__init__(logger)
+        import lxml.html
+
+        self.lxml_html = lxml.html
+
+    @staticmethod
+    def _text(element) -> str:
+        # Entspricht BeautifulSoup get_text(strip=True)
+        return "".join(part.strip() for part in element.itertext())
+
+    def _build_tree(self, html_content: str, form: bool, grades: bool):
+        if not html_content.strip():
+            return None
+        return self.lxml_html.fromstring(html_content)
+
+    def _grades_from_tree(self, tree) -> Optional[List[Grade]]:
+        grade_elements = tree.xpath(self.GRADE_XPATH) if tree is not None else []
+
+        if not grade_elements:
+            return None
+
+        grades = []
+        for element in grade_elements:
+            try:
+                grade_span = element.xpath("(.//span)[1]")
+                if not grade_span:
+                    continue
+
+                module_element = element.xpath("(.//h4[parent::div])[1]")
+                if not module_element:
+                    continue
+
+                grade = self._build_grade(
+                    self._text(grade_span[0]), self._text(module_element[0])
+                )
+                if grade:
+                    grades.append(grade)
+
+            except Exception as e:
+                self.logger.warning(
+                    "Fehler beim Parsen eines Noten-Elements: {error}", error=e
+                )
+                continue
+
+        return grades
+
+    def _form_from_tree(self, tree) -> Optional[Dict[str, str]]:
+        if tree is None or not tree.xpath("//form"):
+            return None
+
+        form_data = {}
+        for input_field in tree.xpath("//input[@type='hidden']"):
+            name = input_field.get("name")
+            if name:
+                form_data[name] = input_field.get("value", "")
+
+        return form_data
+
+
+class SelectolaxParser(GradeParser):
+    """selectolax-Backend (Lexbor), optional installierbar"""
+
+    name = "selectolax"
+
+    def __init__(self, logger):
+        super().__init__(logger)
+        from selectolax.lexbor import LexborHTMLParser
+
+        self.html_parser = LexborHTMLParser
+
+    def _build_tree(self, html_content: str, form: bool, grades: bool):
+        return self.html_parser(html_content)
+
+    def _grades_from_tree(self, tree) -> Optional[List[Grade]]:
+        grade_elements = tree.css(GRADE_SELECTOR)
+
+        if not grade_elements:
+            return None
+
+        grades = []
+        for element in grade_elements:
+            try:
+                grade_span = element.css_first("span")
+                if grade_span is None:
+                    continue
+
+                module_element = element.css_first("div > h4")
+                if module_element is None:
+                    continue
+
+                grade = self._build_grade(
+                    grade_span.text(deep=True, separator="", strip=True),
+                    module_element.text(deep=True, separator="", strip=True),
+                )
+                if grade:
+                    grades.append(grade)
+
+            except Exception as e:
+                self.logger.warning(
+                    "Fehler beim Parsen eines Noten-Elements: {error}", error=e
+                )
+                continue
+
+        return grades
+
+    def _form_from_tree(self, tree) -> Optional[Dict[str, str]]:
+        if tree.css_first("form") is None:
+            return None
+
+        form_data = {}
+        for input_field in tree.css('input[type="hidden"]'):
+            name = input_field.attributes.get("name")
+            if name:
+                form_data[name] = input_field.attributes.get("value") or ""
+
+        return form_data
+
+
+PARSER_BACKENDS = {
+    SelectolaxParser.name: SelectolaxParser,
+    LxmlParser.name: LxmlParser,
+    SoupParser.name: SoupParser,
+}
+
+
+def available_backends() -> List[str]:
+    """Gibt Liste der installierten Parser-Backends zurück (schnellstes zuerst)"""
+    backends = []
+    for name, parser_class in PARSER_BACKENDS.items():
+        try:
+            parser_class(None)
+            backends.append(name)
+        except ImportError:
+            continue
+    return backends
+
+
+def create_parser(backend: str, logger) -> GradeParser:
+    """Erstellt das gewünschte Parser-Backend, Fallback auf html.parser"""
+    if backend == "auto":
+        backend = available_backends()[0]
+
+    parser_class = PARSER_BACKENDS.get(backend)
+    if parser_class is None:
+        logger.warning(
+            "Unbekanntes Parser-Backend '{backend}' - nutze html.parser",
+            backend=backend,
+        )
+        return SoupParser(logger)
+
+    try:
+        return parser_class(logger)
+    except ImportError:
+        logger.warning(
+            "Parser-Backend '{backend}' nicht installiert - nutze html.parser",
+            backend=backend,
+        )
+        return SoupParser(logger)
@@ -0,0 +1,128 @@
+"""
+Gestaffelte Planung der Prüfungen und globales Rate-Limit zum Portal
+"""
+
+import asyncio
+import hashlib
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def stagger_offset(key: str, index: int, count: int, interval: float) -> float:
+    """Verteilt Accounts gleichmäßig über das Intervall, mit festem Jitter pro Key"""
+    slot = interval / max(count, 1)
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    jitter = int.from_bytes(digest, "big") / 2**64  # deterministisch, [0, 1)
+    return slot * (index + 0.5 * jitter)
+
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket (Requests pro Sekunde über alle Accounts)"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Entnimmt ein Token und liefert die nötige Wartezeit"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Blockiert bis ein Request erlaubt ist"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wie acquire(), ohne die Event-Loop zu blockieren"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class StaggeredScheduler:
+    """Zeitplan aller Accounts mit festen Phasen innerhalb des Intervalls"""
+
+    def __init__(self):
+        self.heap = []  # (fällig um, Key), veraltete Einträge werden übersprungen
+        self.due: Dict[str, float] = {}
+        self.active = set()  # ausgegeben, aber noch nicht neu eingeplant
+        self.triggered = set()  # nach der laufenden Prüfung sofort erneut
+        self.running = True
+        self.condition = threading.Condition()
+
+    def add_all(self, keys: List[str], interval_for):
+        """Plant alle Keys gestaffelt über ihr jeweiliges Intervall ein"""
+        now = time.monotonic()
+        for index, key in enumerate(keys):
+            offset = stagger_offset(key, index, len(keys), interval_for(key))
+            self._push(key, now + offset)
+
+    def _push(self, key: str, due: float):
+        with self.condition:
+            self.due[key] = due
+            heapq.heappush(self.heap, (due, key))
+            self.condition.notify_all()
+
+    def reschedule(self, key: str, interval: float):
+        """Nächste Prüfung eine Intervall-Länge nach der letzten Fälligkeit (Phase bleibt)"""
+        interval = max(interval, 1.0)
+        with self.condition:
+            self.active.discard(key)
+            now = time.monotonic()
+            if key in self.triggered:
+                self.triggered.discard(key)
+                self._push(key, now)
+                return
+
+            due = self.due.get(key, now) + interval
+            if due <= now:
+                # Rückstand nicht nachholen, sondern in der eigenen Phase bleiben
+                due += ((now - due) // interval + 1) * interval
+            self._push(key, due)
+
+    def trigger(self, key: str):
+        """Zieht die nächste Prüfung eines Keys auf sofort vor"""
+        with self.condition:
+            if key in self.active:
+                self.triggered.add(key)
+            else:
+                self._push(key, time.monotonic())
+
+    def next_due(self) -> Optional[str]:
+        """Wartet bis der nächste Key fällig ist (None nach stop())"""
+        with self.condition:
+            while self.running:
+                if self.heap:
+                    due, key = self.heap[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self.heap)
+                        if self.due.get(key) != due:
+                            continue  # durch reschedule()/trigger() ersetzt
+                        self.active.add(key)
+                        return key
+                    self.condition.wait(wait)
+                else:
+                    self.condition.wait()
+            return None
+
+    def stop(self):
+        """Beendet next_due() sofort"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
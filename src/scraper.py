@@ -2,20 +2,46 @@
 Web-Scraper für HTW Dresden Noten-Portal
 """
 
-import re
+import time
 from typing import Dict, List, Optional
 
 import requests
-from bs4 import BeautifulSoup
 
+import metrics
+from analyzer import ResponseAnalysis, ResponseAnalyzer
+from grades import Grade
+from parsers import create_parser
+from tracing import NO_TRACE
 
-class HTWDScraper:
-    """Web-Scraper für das HTW Dresden Noten-Portal"""
 
-    def __init__(self, config, logger):
+class BaseScraper:
+    """Gemeinsamer Ablauf Login → Abruf → Parse, ohne eigene Requests
+
+    Entscheidet anhand der analysierten Antworten (Login-Erfolg, Session-Ablauf,
+    unveränderte Seite). Die Requests führen HTWDScraper (requests) und
+    AsyncHTWDScraper (aiohttp) aus.
+    """
+
+    def __init__(self, config, logger, rate_limiter=None):
         self.config = config
         self.logger = logger
+        self.rate_limiter = rate_limiter
         self.session = None
+        self.login_analysis = None
+        self.configure_parser()
+
+        # Trace des laufenden Prüfzyklus (vom GradeChecker gesetzt)
+        self.trace = NO_TRACE
+
+        # Fingerprint der letzten Noten-Seite (Parsing überspringen wenn gleich)
+        self.page_fingerprint = None
+        self.cached_grades = None
+        self.validators = {}
+        # Neuer Stand, erst nach commit() gültig (Verarbeitung erfolgreich)
+        self.staged = {}
+        self.grades_unchanged = False
+        self.fetch_count = 0
+        self.unchanged_count = 0
 
         # Request-Headers für bessere Kompatibilität
         self.headers = {
@@ -27,6 +53,210 @@ class HTWDScraper:
             "Upgrade-Insecure-Requests": "1",
         }
 
+    def configure_parser(self):
+        """Erstellt Parser und Analyse für das konfigurierte PARSER_BACKEND"""
+        self.parser = create_parser(self.config.parser_backend, self.logger)
+        self.analyzer = ResponseAnalyzer(self.parser, self.logger)
+
+    def _create_session(self):
+        """Erstellt die HTTP-Session - muss von Subklassen implementiert werden"""
+        raise NotImplementedError
+
+    def _open_session(self) -> bool:
+        """Neue Session für einen Login (vorher close() aufrufen)"""
+        self.login_analysis = None
+        with self.trace.span("session"):
+            self.session = self._create_session()
+        if not self.session:
+            return False
+
+        self.logger.debug(
+            "Starte Login für Benutzer: {user}", user=self.config.htwd_username
+        )
+        return True
+
+    def _login_form_data(self, response) -> Optional[Dict[str, str]]:
+        """Formular-Daten inkl. Zugangsdaten aus der Login-Seite (None bei Fehler)"""
+        if response.status_code != 200:
+            self.logger.error(
+                "Login-Seite nicht erreichbar: HTTP {status}",
+                status=response.status_code,
+            )
+            return None
+
+        # Login-Formular analysieren
+        with self.trace.span("parse", page="login_form"):
+            form_data = self._form_data_from(self.analyzer.analyze(response))
+
+        if form_data is None:
+            self.logger.error("Login-Formular nicht gefunden")
+            return None
+
+        # Formular-Daten vorbereiten
+        form_data.update(
+            {
+                "user": self.config.htwd_username,
+                "pass": self.config.htwd_password,
+                "submit": "Anmelden",
+                "logintype": "login",
+            }
+        )
+        return form_data
+
+    def _accept_login(self, login_response) -> bool:
+        """Prüft die Login-Antwort (Noten werden im selben Durchlauf mitgeparst)"""
+        login_analysis = self._analyze_grade_response(login_response)
+        if not login_analysis.login_successful:
+            self.logger.error("Login fehlgeschlagen - Benutzerdaten prüfen")
+            return False
+
+        self.logger.info("Login erfolgreich")
+        self.login_analysis = login_analysis
+        # Noten-Seite aus der Login-Antwort: Basis für Conditional Requests
+        if login_analysis.status_code == 200 and login_analysis.has_grade_list:
+            self._update_validators(login_response)
+        return True
+
+    def _record_login(self, start: float, success: bool):
+        """Misst Dauer und Fehlschläge eines Logins"""
+        user = self.config.htwd_username
+        metrics.LOGIN_SECONDS.observe(time.perf_counter() - start, user=user)
+        if not success:
+            metrics.LOGIN_FAILURES.inc(user=user)
+
+    def _login_grades(self) -> Optional[ResponseAnalysis]:
+        """Noten-Seite aus der Login-Antwort, falls der Login dort landete"""
+        login_analysis, self.login_analysis = self.login_analysis, None
+        if login_analysis.status_code == 200 and login_analysis.has_grade_list:
+            self.logger.debug("Noten-Liste aus Login-Antwort übernommen")
+            return login_analysis
+        return None
+
+    def _form_data_from(self, analysis: ResponseAnalysis) -> Optional[Dict[str, str]]:
+        """Liefert die versteckten Formular-Daten einer Analyse"""
+        form_data = analysis.form_data
+
+        if self.config.debug_mode and form_data is not None:
+            self.logger.debug(
+                "Extrahierte Formular-Daten: {fields}", fields=list(form_data)
+            )
+
+        return form_data
+
+    def _is_login_successful(self, response: requests.Response) -> bool:
+        """Prüft ob Login erfolgreich war"""
+        return self.analyzer.analyze(response, parse=False).login_successful
+
+    def _grades_from(self, analysis: ResponseAnalysis) -> List[Grade]:
+        """Liefert die Noten einer Analyse (leer bei fehlenden Noten-Elementen)"""
+        if analysis.grades is None:
+            metrics.PARSE_WARNINGS.inc(user=self.config.htwd_username)
+            self.logger.warning(
+                "Keine Noten-Elemente gefunden - möglicherweise Layout-Änderung"
+            )
+            return []
+
+        if self.config.debug_mode:
+            self.logger.log_grades(analysis.grades, "Geparste Noten")
+
+        return analysis.grades
+
+    def _analyze_grade_response(self, response: requests.Response) -> ResponseAnalysis:
+        """Analysiert eine (mögliche) Noten-Seite gegen den letzten Fingerprint"""
+        previous = self.page_fingerprint if self.cached_grades is not None else None
+        with metrics.PARSE_SECONDS.time(user=self.config.htwd_username):
+            with self.trace.span("parse", page="grades") as span:
+                analysis = self.analyzer.analyze(
+                    response, previous_fingerprint=previous
+                )
+                span["unchanged"] = analysis.unchanged
+                if analysis.grades is not None:
+                    span["grades"] = len(analysis.grades)
+        return analysis
+
+    def _grade_analysis(self, response) -> ResponseAnalysis:
+        """Analysiert eine abgerufene Noten-Seite und merkt sich deren Validatoren"""
+        if response.status_code == 200:
+            self._update_validators(response)
+        return self._analyze_grade_response(response)
+
+    def _session_expired(self, analysis: ResponseAnalysis) -> bool:
+        """Login-Formular statt Noten-Seite: erneuter Login nötig"""
+        if analysis.status_code == 200 and analysis.session_expired:
+            self.logger.info("Session abgelaufen - erneuter Login")
+            return True
+        return False
+
+    def _begin_cycle(self):
+        """Setzt den Stand des vorigen Abrufs zurück"""
+        self.grades_unchanged = False
+        self.staged = {}
+
+    def _update_validators(self, response: requests.Response):
+        """Merkt sich ETag/Last-Modified für den nächsten Conditional Request"""
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self.staged["validators"] = validators
+
+    def commit(self):
+        """Übernimmt Fingerprint, Noten und Validatoren des letzten Abrufs
+
+        Erst aufrufen, wenn die Noten verarbeitet sind. Schlägt die Verarbeitung
+        fehl, wird die Seite beim nächsten Abruf erneut geliefert und geparst.
+        """
+        for name, value in self.staged.items():
+            setattr(self, name, value)
+        self.staged = {}
+
+    def _mark_unchanged(self) -> List[Grade]:
+        """Zählt einen übersprungenen Durchlauf und liefert die letzten Noten"""
+        self.grades_unchanged = True
+        self.unchanged_count += 1
+        self.logger.debug(
+            "Noten-Seite unverändert - Parsing übersprungen "
+            "({unchanged}/{fetches} Abrufe)",
+            unchanged=self.unchanged_count,
+            fetches=self.fetch_count,
+        )
+        return self.cached_grades
+
+    def _grades_from_analysis(
+        self, analysis: ResponseAnalysis
+    ) -> Optional[List[Grade]]:
+        """Wertet die analysierte Noten-Seite aus (None bei Fehler)"""
+        self.fetch_count += 1
+
+        if analysis.status_code == 304 and self.cached_grades is not None:
+            return self._mark_unchanged()
+
+        if analysis.status_code != 200:
+            self.logger.error(
+                "Noten-Seite nicht erreichbar: HTTP {status}",
+                status=analysis.status_code,
+            )
+            return None
+
+        # Unveränderte Seite wurde nicht erneut geparst
+        if analysis.unchanged:
+            return self._mark_unchanged()
+
+        grades = self._grades_from(analysis)
+
+        if grades:
+            self.logger.info("{count} Noten erfolgreich abgerufen", count=len(grades))
+        else:
+            self.logger.warning("Keine Noten gefunden")
+
+        self.staged.update(page_fingerprint=analysis.fingerprint, cached_grades=grades)
+        return grades
+
+
+class HTWDScraper(BaseScraper):
+    """Web-Scraper für das HTW Dresden Noten-Portal (requests)"""
+
     def _create_session(self) -> Optional[requests.Session]:
         """Erstellt eine neue Session mit Konfiguration"""
         try:
@@ -61,196 +291,135 @@ class HTWDScraper:
             return session
 
         except Exception as e:
-            self.logger.error(f"Fehler beim Erstellen der Session: {e}")
+            self.logger.error("Fehler beim Erstellen der Session: {error}", error=e)
             return None
 
+    def _throttle(self):
+        """Wartet auf das gemeinsame Rate-Limit (Multi-User-Betrieb)"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+    def _count_retries(self, response: requests.Response) -> int:
+        """Zählt die Wiederholungen, die urllib3 für diesen Request gebraucht hat"""
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        if retries is None or not retries.history:
+            return 0
+        metrics.RETRIES.inc(len(retries.history), user=self.config.htwd_username)
+        return len(retries.history)
+
+    def _portal_request(self, phase: str, method: str, **kwargs) -> requests.Response:
+        """Request zum Portal mit Rate-Limit und Trace-Span (ohne Wartezeit)"""
+        self._throttle()
+        with self.trace.span(phase) as span:
+            response = self.session.request(
+                method, self.config.htwd_url, timeout=10, **kwargs
+            )
+            span["status"] = response.status_code
+            span["bytes"] = len(response.content)
+            span["retries"] = self._count_retries(response)
+
+        self.logger.log_request_debug(
+            self.config.htwd_url, response.status_code, len(response.content)
+        )
+        return response
+
+    def _get_grade_page(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Lädt die Noten-Seite mit der bestehenden Session"""
+        with metrics.FETCH_SECONDS.time(user=self.config.htwd_username):
+            return self._portal_request("grade_page", "GET", headers=headers)
+
+    def _timed_login(self) -> bool:
+        """Login mit Messung von Dauer und Fehlschlägen"""
+        start = time.perf_counter()
+        success = self._login()
+        self._record_login(start, success)
+        return success
+
     def _login(self) -> bool:
         """Führt Login auf HTW-Portal durch"""
         try:
-            self.session = self._create_session()
-            if not self.session:
+            self.close()
+            if not self._open_session():
                 return False
 
-            self.logger.debug(f"Starte Login für Benutzer: {self.config.htwd_username}")
-
             # Erste Anfrage um Login-Seite zu laden
-            response = self.session.get(self.config.htwd_url, timeout=10)
-            self.logger.log_request_debug(
-                self.config.htwd_url, response.status_code, len(response.content)
+            form_data = self._login_form_data(
+                self._portal_request("login_page", "GET")
             )
-
-            if response.status_code != 200:
-                self.logger.error(
-                    f"Login-Seite nicht erreichbar: HTTP {response.status_code}"
-                )
-                return False
-
-            # Login-Formular analysieren
-            soup = BeautifulSoup(response.text, "html.parser")
-            form = soup.find("form")
-
-            if not form:
-                self.logger.error("Login-Formular nicht gefunden")
+            if form_data is None:
                 return False
 
-            # Formular-Daten vorbereiten
-            form_data = self._extract_form_data(soup)
-            form_data.update(
-                {
-                    "user": self.config.htwd_username,
-                    "pass": self.config.htwd_password,
-                    "submit": "Anmelden",
-                    "logintype": "login",
-                }
-            )
-
             # Login durchführen
-            login_response = self.session.post(
-                self.config.htwd_url, data=form_data, timeout=10, allow_redirects=True
-            )
-
-            self.logger.log_request_debug(
-                self.config.htwd_url, login_response.status_code
+            login_response = self._portal_request(
+                "login_post", "POST", data=form_data, allow_redirects=True
             )
-
-            # Login-Erfolg prüfen
-            if self._is_login_successful(login_response):
-                self.logger.info("Login erfolgreich")
+            if self._accept_login(login_response):
                 return True
-            else:
-                self.logger.error("Login fehlgeschlagen - Benutzerdaten prüfen")
-                return False
+            self.close()
+            return False
 
         except requests.exceptions.Timeout:
             self.logger.error("Login-Timeout - Server nicht erreichbar")
             return False
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"Login-Fehler: {e}")
+            self.logger.error("Login-Fehler: {error}", error=e)
             return False
         except Exception as e:
-            self.logger.error(f"Unerwarteter Login-Fehler: {e}")
+            self.logger.error("Unerwarteter Login-Fehler: {error}", error=e)
             return False
 
-    def _extract_form_data(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extrahiert versteckte Formular-Daten"""
-        form_data = {}
-
-        # Versteckte Input-Felder finden
-        hidden_inputs = soup.find_all("input", type="hidden")
-        for input_field in hidden_inputs:
-            name = input_field.get("name")
-            value = input_field.get("value", "")
-            if name:
-                form_data[name] = value
-
-        if self.config.debug_mode:
-            self.logger.debug(f"Extrahierte Formular-Daten: {list(form_data.keys())}")
-
-        return form_data
-
-    def _is_login_successful(self, response: requests.Response) -> bool:
-        """Prüft ob Login erfolgreich war"""
-        # Verschiedene Erfolgs-Indikatoren prüfen
-        success_indicators = [
-            "noten-und-pruefungen" in response.url.lower(),
-            "anmelden" not in response.text.lower(),
-            response.status_code == 200,
-        ]
-
-        # Fehler-Indikatoren prüfen
-        error_indicators = [
-            "fehler" in response.text.lower(),
-            "ungültig" in response.text.lower(),
-            "benutzername oder passwort" in response.text.lower(),
-        ]
-
-        return any(success_indicators) and not any(error_indicators)
-
-    def _parse_grades(self, html_content: str) -> List[Dict[str, str]]:
-        """Parst Noten aus HTML-Inhalt"""
-        try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            grades = []
-
-            # Noten-Elemente finden (basierend auf den Screenshots)
-            grade_elements = soup.select(
-                ".align-items-baseline.collapsed.list-group-item.list-group-custom-item"
-            )
-
-            if not grade_elements:
-                self.logger.warning(
-                    "Keine Noten-Elemente gefunden - möglicherweise Layout-Änderung"
-                )
-                return []
-
-            for element in grade_elements:
-                try:
-                    # Note extrahieren
-                    grade_span = element.select_one("span")
-                    if not grade_span:
-                        continue
-
-                    grade_text = grade_span.get_text(strip=True)
-
-                    # Nur numerische Noten (Format: X,X)
-                    if not re.match(r"^\d+,\d+$", grade_text):
-                        continue
-
-                    # Modul extrahieren
-                    module_element = element.select_one("div > h4")
-                    if not module_element:
-                        continue
-
-                    module_text = module_element.get_text(strip=True)
-
-                    grades.append({"grade": grade_text, "module": module_text})
+    def _login_and_fetch(self) -> Optional[ResponseAnalysis]:
+        """Meldet sich an und liefert die analysierte Noten-Seite"""
+        if not self._timed_login():
+            return None
 
-                except Exception as e:
-                    self.logger.warning(f"Fehler beim Parsen eines Noten-Elements: {e}")
-                    continue
+        # Login-Antwort landet per Redirect meist schon auf der Noten-Seite
+        return self._login_grades() or self._grade_analysis(self._get_grade_page())
 
-            if self.config.debug_mode:
-                self.logger.log_grades(grades, "Geparste Noten")
+    def _fetch_grade_page(self) -> Optional[ResponseAnalysis]:
+        """Lädt die Noten-Seite, meldet sich bei abgelaufener Session neu an"""
+        if self.session is None:
+            return self._login_and_fetch()
 
-            return grades
+        # Conditional Request, falls das Portal ETag/Last-Modified liefert
+        analysis = self._grade_analysis(self._get_grade_page(self.validators))
+        if self._session_expired(analysis):
+            return self._login_and_fetch()
+        return analysis
 
-        except Exception as e:
-            self.logger.error(f"Fehler beim Parsen der Noten: {e}")
-            return []
-
-    def get_grades(self) -> Optional[List[Dict[str, str]]]:
-        """Hauptfunktion zum Abrufen der Noten"""
+    def get_grades(self) -> Optional[List[Grade]]:
+        """Hauptfunktion zum Abrufen der Noten (danach commit() aufrufen)"""
+        self._begin_cycle()
         try:
-            # Login durchführen
-            if not self._login():
-                return None
-
-            # Noten-Seite laden
-            response = self.session.get(self.config.htwd_url, timeout=10)
-            self.logger.log_request_debug(self.config.htwd_url, response.status_code)
-
-            if response.status_code != 200:
-                self.logger.error(
-                    f"Noten-Seite nicht erreichbar: HTTP {response.status_code}"
-                )
+            # Ohne persistente Session bei jedem Durchlauf neu anmelden
+            if not self.config.persistent_session:
+                self.close()
+
+            # Noten-Seite laden und analysieren
+            analysis = self._fetch_grade_page()
+            if analysis is None:
+                self.close()
                 return None
 
-            # Noten parsen
-            grades = self._parse_grades(response.text)
-
-            if grades:
-                self.logger.info(f"{len(grades)} Noten erfolgreich abgerufen")
-            else:
-                self.logger.warning("Keine Noten gefunden")
-
+            grades = self._grades_from_analysis(analysis)
+            if grades is None:
+                self.close()
             return grades
 
         except Exception as e:
-            self.logger.error(f"Fehler beim Abrufen der Noten: {e}")
+            self.logger.error("Fehler beim Abrufen der Noten: {error}", error=e)
+            # Session verwerfen, nächster Durchlauf meldet sich neu an
+            self.close()
             return None
 
         finally:
-            # Session schließen
-            if self.session:
-                self.session.close()
-                self.session = None
+            if not self.config.persistent_session:
+                self.close()
+
+    def close(self):
+        """Schließt die Session"""
+        if self.session:
+            self.session.close()
+            self.session = None
@@ -0,0 +1,115 @@
+"""
+Persistenter Noten-Zustand (SQLite, WAL) über Neustarts hinweg
+"""
+
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+from grades import Grade
+
+
+class GradeStateStore:
+    """Speichert den zuletzt bekannten Noten-Stand pro Benutzer"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS grades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            module TEXT NOT NULL,
+            grade TEXT NOT NULL,
+            attempt INTEGER NOT NULL DEFAULT 0,
+            seen_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (user, module, grade, attempt)
+        )
+    """
+
+    # Benutzer mit gespeichertem Stand - auch wenn noch keine Noten vorliegen
+    USERS_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS state_users (
+            user TEXT PRIMARY KEY,
+            initialized_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+    def __init__(self, path: str, user: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.user = user
+        self.lock = threading.Lock()
+
+        # Mehrere Benutzer (Threads) teilen sich im Daemon dieselbe Datei
+        self.connection = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(self.SCHEMA)
+        self.connection.execute(self.USERS_SCHEMA)
+        self.connection.commit()
+
+        self.saved = set()
+        self.initialized = False
+
+    @staticmethod
+    def _keys(grades: List[Grade]) -> List[Tuple[str, str, int]]:
+        """(Modul, Note, Versuch) - gleiche Noten eines Moduls werden durchgezählt"""
+        seen = Counter()
+        keys = []
+        for grade in grades:
+            pair = (grade.module, grade.text)
+            keys.append((*pair, seen[pair]))
+            seen[pair] += 1
+        return keys
+
+    def load(self) -> List[Grade]:
+        """Lädt den zuletzt gespeicherten Noten-Stand in Einfüge-Reihenfolge"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT module, grade, attempt FROM grades WHERE user = ? ORDER BY id",
+                (self.user,),
+            ).fetchall()
+            self.initialized = bool(
+                self.connection.execute(
+                    "SELECT 1 FROM state_users WHERE user = ?", (self.user,)
+                ).fetchone()
+            )
+
+        self.saved = set(rows)
+        return [Grade.from_text(grade, module) for module, grade, _ in rows]
+
+    def save(self, grades: List[Grade]) -> int:
+        """Schreibt nur die Änderungen seit dem letzten Speichern, liefert deren Anzahl"""
+        # Reihenfolge der Seite beibehalten, wiederholte Versuche einzeln
+        current = self._keys(grades)
+        added = [key for key in current if key not in self.saved]
+        removed = self.saved.difference(current)
+
+        if not added and not removed and self.initialized:
+            return 0
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO state_users (user) VALUES (?)", (self.user,)
+            )
+            self.connection.executemany(
+                "DELETE FROM grades "
+                "WHERE user = ? AND module = ? AND grade = ? AND attempt = ?",
+                [(self.user, *key) for key in removed],
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO grades (user, module, grade, attempt) "
+                "VALUES (?, ?, ?, ?)",
+                [(self.user, *key) for key in added],
+            )
+
+        self.saved = set(current)
+        self.initialized = True
+        return len(added) + len(removed)
+
+    def close(self):
+        """Schließt die Datenbankverbindung"""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,122 @@
+"""
+Gemeinsamer Telegram-Versand für viele Chats über einen Bot-Token
+"""
+
+import threading
+import time
+from typing import Dict
+
+import requests
+
+from scheduler import TokenBucket
+
+# Limits der Telegram Bot API
+GLOBAL_MESSAGES_PER_SECOND = 30
+PRIVATE_CHAT_MESSAGES_PER_SECOND = 1
+GROUP_CHAT_MESSAGES_PER_SECOND = 20 / 60
+
+# Länger wird auf retry_after nicht gewartet (die Outbox versucht es später)
+MAX_RETRY_WAIT = 10
+MAX_ATTEMPTS = 3
+
+
+class RateLimited(Exception):
+    """Telegram verlangt eine längere Pause als MAX_RETRY_WAIT"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate-Limit - erneut möglich in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TelegramDispatcher:
+    """Verteilt Nachrichten eines Bots auf beliebig viele Chats
+
+    Alle Benutzer mit demselben Bot-Token teilen sich das globale Limit
+    (~30 Nachrichten/s). Zusätzlich gilt pro Chat ein eigenes Limit, und
+    ein 429 mit retry_after pausiert den betroffenen Chat.
+    """
+
+    def __init__(self, bot_token: str):
+        self.api_url = f"https://api.telegram.org/bot{bot_token}"
+        self.global_limit = TokenBucket(
+            GLOBAL_MESSAGES_PER_SECOND, GLOBAL_MESSAGES_PER_SECOND
+        )
+        self.chat_limits: Dict[str, TokenBucket] = {}
+        self.blocked_until: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def _chat_limit(self, chat_id: str) -> TokenBucket:
+        with self.lock:
+            if chat_id not in self.chat_limits:
+                # Gruppen und Kanäle haben negative IDs und ein strengeres Limit
+                rate = (
+                    GROUP_CHAT_MESSAGES_PER_SECOND
+                    if chat_id.startswith("-")
+                    else PRIVATE_CHAT_MESSAGES_PER_SECOND
+                )
+                self.chat_limits[chat_id] = TokenBucket(rate)
+            return self.chat_limits[chat_id]
+
+    def _block(self, chat_id: str, retry_after: float):
+        with self.lock:
+            until = time.monotonic() + retry_after
+            self.blocked_until[chat_id] = max(self.blocked_until.get(chat_id, 0), until)
+
+    def _wait_until_unblocked(self, chat_id: str):
+        with self.lock:
+            remaining = self.blocked_until.get(chat_id, 0) - time.monotonic()
+        if remaining > MAX_RETRY_WAIT:
+            raise RateLimited(remaining)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        """retry_after aus der Fehler-Antwort (oder dem Header)"""
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.headers.get("Retry-After", 1))
+
+    def send_message(
+        self,
+        session: requests.Session,
+        chat_id: str,
+        text: str,
+        parse_mode: str = "Markdown",
+        timeout: float = 10,
+    ) -> requests.Response:
+        """Sendet eine Nachricht unter Einhaltung aller Limits
+
+        Liefert die letzte Antwort der API. Wartet bei 429 höchstens
+        MAX_RETRY_WAIT Sekunden, sonst RateLimited.
+        """
+        chat_id = str(chat_id)
+        data = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+
+        for _ in range(MAX_ATTEMPTS):
+            self._wait_until_unblocked(chat_id)
+            self._chat_limit(chat_id).acquire()
+            self.global_limit.acquire()
+
+            response = session.post(
+                f"{self.api_url}/sendMessage", data=data, timeout=timeout
+            )
+            if response.status_code != 429:
+                return response
+
+            self._block(chat_id, self._retry_after(response))
+
+        return response
+
+
+_dispatchers: Dict[str, TelegramDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(bot_token: str) -> TelegramDispatcher:
+    """Ein Dispatcher pro Bot-Token und Prozess"""
+    with _dispatchers_lock:
+        if bot_token not in _dispatchers:
+            _dispatchers[bot_token] = TelegramDispatcher(bot_token)
+        return _dispatchers[bot_token]
@@ -0,0 +1,100 @@
+"""
+Tracing eines Prüfzyklus: Dauer jeder Phase als ein JSON-Datensatz pro Zyklus
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# Phasen, die auf das HTW-Portal warten (Netzwerk und Server)
+PORTAL_SPANS = {"login_page", "login_post", "grade_page"}
+
+
+class CycleTrace:
+    """Sammelt die Phasen (Spans) eines Prüfzyklus
+
+    Jeder Span enthält Name, Startzeitpunkt und Dauer relativ zum Zyklus
+    sowie beliebige Attribute (z.B. Status, Bytes, Retries).
+    """
+
+    def __init__(self, user: str):
+        self.user = user
+        self.started = datetime.now()
+        self.start = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.lock = threading.Lock()  # Benachrichtigungen laufen parallel
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Misst den with-Block, Attribute kommen ins gelieferte dict"""
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            entry = {
+                "name": name,
+                "at_ms": round((start - self.start) * 1000, 2),
+                "ms": round((end - start) * 1000, 2),
+            }
+            entry.update(attributes)
+            with self.lock:
+                self.spans.append(entry)
+
+    def record(self) -> Dict:
+        """Datensatz des Zyklus mit Summen für Portal-Zeit, Parsing, Bytes, Retries"""
+        with self.lock:
+            spans = list(self.spans)
+
+        def total(key: str, names=None) -> float:
+            return round(
+                sum(
+                    span.get(key, 0)
+                    for span in spans
+                    if names is None or span["name"] in names
+                ),
+                2,
+            )
+
+        return {
+            "time": self.started.isoformat(timespec="seconds"),
+            "user": self.user,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 2),
+            "portal_ms": total("ms", PORTAL_SPANS),
+            "parse_ms": total("ms", {"parse"}),
+            "bytes": int(total("bytes")),
+            "retries": int(total("retries")),
+            "spans": spans,
+        }
+
+
+class _NoTrace:
+    """Platzhalter, wenn Tracing deaktiviert ist (misst nichts)"""
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        yield attributes
+
+
+NO_TRACE = _NoTrace()
+
+
+class TraceWriter:
+    """Hängt die Datensätze als JSON-Zeilen an eine Datei an"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def write(self, trace: CycleTrace):
+        line = json.dumps(trace.record(), ensure_ascii=False)
+        with self.lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
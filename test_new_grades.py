@@ -8,12 +8,14 @@ import signal
 import sys
 import time
 from datetime import datetime
-from typing import Dict, List
+from typing import List
 
 # Add src to path
 sys.path.append("src")
 
 from src.config import Config
+from src.diff import diff_grades
+from src.grades import Grade
 from src.logger import Logger
 from src.notifications import NotificationManager
 
@@ -39,15 +41,15 @@ class MockGradeChecker:
         self.logger.info(f"Signal {signum} empfangen. Beende Test...")
         self.running = False
 
-    def _get_mock_grades(self) -> List[Dict[str, str]]:
+    def _get_mock_grades(self) -> List[Grade]:
         """Generiert Mock-Noten mit simulierten neuen Noten"""
 
         # Basis-Noten (immer vorhanden)
         base_grades = [
-            {"grade": "1,3", "module": "Mathematik I"},
-            {"grade": "2,0", "module": "Programmierung"},
-            {"grade": "1,7", "module": "Datenbanken"},
-            {"grade": "2,3", "module": "Betriebssysteme"},
+            Grade.from_text("1,3", "Mathematik I"),
+            Grade.from_text("2,0", "Programmierung"),
+            Grade.from_text("1,7", "Datenbanken"),
+            Grade.from_text("2,3", "Betriebssysteme"),
         ]
 
         # Neue Noten basierend auf Zyklen hinzufügen
@@ -70,37 +72,17 @@ class MockGradeChecker:
             grades_pool = ["1,0", "1,3", "1,7", "2,0", "2,3", "2,7"]
 
             module_index = (self.cycle_count // 3 - 1) % len(new_modules)
-            new_grade = {
-                "grade": random.choice(grades_pool),
-                "module": new_modules[module_index],
-            }
+            new_grade = Grade.from_text(
+                random.choice(grades_pool), new_modules[module_index]
+            )
 
             base_grades.append(new_grade)
             self.logger.info(
-                f"🎯 SIMULATION: Neue Note hinzugefügt - {new_grade['module']}: {new_grade['grade']}"
+                f"🎯 SIMULATION: Neue Note hinzugefügt - {new_grade}"
             )
 
         return base_grades
 
-    def _find_new_grades(self, current_grades: list) -> list:
-        """Findet neue Noten durch Vergleich mit vorherigen"""
-        new_grades = []
-
-        for grade in current_grades:
-            is_new = True
-            for prev_grade in self.previous_grades:
-                if (
-                    grade["module"] == prev_grade["module"]
-                    and grade["grade"] == prev_grade["grade"]
-                ):
-                    is_new = False
-                    break
-
-            if is_new:
-                new_grades.append(grade)
-
-        return new_grades
-
     def _send_notifications(self, new_grades: list):
         """Sendet Benachrichtigungen für neue Noten"""
         # Allgemeine Benachrichtigung
@@ -112,7 +94,7 @@ class MockGradeChecker:
         if self.config.post_individual_grades:
             for grade in new_grades:
                 self.notification_manager.send_notification(
-                    f"{grade['module']} (TEST)", f"Note: {grade['grade']}"
+                    f"{grade.module} (TEST)", f"Note: {grade.text}"
                 )
 
     def _check_for_new_grades(self):
@@ -130,12 +112,12 @@ class MockGradeChecker:
                 return
 
             # Neue Noten suchen
-            new_grades = self._find_new_grades(current_grades)
+            new_grades = diff_grades(self.previous_grades, current_grades).added
 
             if new_grades:
                 self.logger.info(f"🚨 {len(new_grades)} neue Note(n) gefunden!")
                 for grade in new_grades:
-                    self.logger.info(f"   📝 {grade['module']}: {grade['grade']}")
+                    self.logger.info(f"   📝 {grade}")
 
                 self._send_notifications(new_grades)
                 self.previous_grades = current_grades
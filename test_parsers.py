@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test-Script für die Parser-Backends
+Prüft, dass alle installierten Backends identische Noten-Listen liefern
+"""
+
+import sys
+
+# Add src to path
+sys.path.append("src")
+
+from src.logger import Logger
+from src.parsers import PARSER_BACKENDS, SoupParser, available_backends
+
+ITEM_CLASSES = "align-items-baseline collapsed list-group-item list-group-custom-item"
+
+
+def _item(grade: str, module: str, classes: str = ITEM_CLASSES) -> str:
+    return (
+        f'<a class="{classes}" href="#">'
+        f'<span class="badge">{grade}</span>'
+        f"<div><h4>{module}</h4><small>Prüfung</small></div>"
+        f"</a>"
+    )
+
+
+def _page(*items: str) -> str:
+    return (
+        "<html><head><title>Noten und Prüfungen</title></head><body>"
+        '<div class="list-group">' + "".join(items) + "</div></body></html>"
+    )
+
+
+GRADE_PAGES = {
+    "standard": _page(
+        _item("1,3", "Mathematik I"),
+        _item("2,0", "Programmierung"),
+        _item("1,7", "Datenbanken"),
+    ),
+    "nicht-numerische Noten": _page(
+        _item("1,0", "Analysis"),
+        _item("bestanden", "Praktikum"),
+        _item("", "Leere Note"),
+        _item("5", "Ganze Zahl"),
+        _item("2,3", "Rechnernetze"),
+    ),
+    "Whitespace und Entities": _page(
+        _item("\n  1,3  \n", "\n   Theoretische &amp; Technische Informatik\n  "),
+        _item("2,7", "Künstliche <em>Intelligenz</em>"),
+        _item("3,0", "Modul <!-- Kommentar --> mit Kommentar"),
+    ),
+    "fehlende Elemente": _page(
+        '<a class="' + ITEM_CLASSES + '"><div><h4>Ohne Note</h4></div></a>',
+        '<a class="' + ITEM_CLASSES + '"><span>1,7</span><h4>Ohne div</h4></a>',
+        _item("2,0", "Vollständig"),
+    ),
+    "unvollständige Klassen": _page(
+        _item("1,0", "Nur Teil-Klassen", "list-group-item list-group-custom-item"),
+        _item("1,3", "Zusätzliche Klasse", ITEM_CLASSES + " active"),
+        _item("4,0", "Andere Reihenfolge", " ".join(reversed(ITEM_CLASSES.split()))),
+    ),
+    "verschachtelte Spans": _page(
+        f'<a class="{ITEM_CLASSES}"><span><b>1</b>,<i>7</i></span>'
+        "<div><span>ignoriert</span><div><h4>Tief verschachtelt</h4></div></div></a>",
+    ),
+    "doppelte Module": _page(
+        _item("5,0", "Mathematik II"),
+        _item("2,3", "Mathematik II"),
+    ),
+    "viele Noten": _page(
+        *[_item(f"{1 + i % 4},{(i * 3) % 10}", f"Modul {i}") for i in range(500)]
+    ),
+    "keine Noten-Elemente": "<html><body><p>Wartungsarbeiten</p></body></html>",
+    "leere Liste": _page(),
+}
+
+LOGIN_PAGES = {
+    "Login-Formular": (
+        "<html><body><form method='post' action='/login'>"
+        "<input type='hidden' name='__trustedProperties' value='a:1:{s:4:&quot;user&quot;;}'>"
+        "<input type='hidden' name='logintype' value='login'>"
+        "<input type='hidden' name='leer'>"
+        "<input type='hidden' value='ohne-name'>"
+        "<input type='text' name='user'><input type='password' name='pass'>"
+        "<input type='submit' name='submit' value='Anmelden'>"
+        "</form></body></html>"
+    ),
+    "kein Formular": "<html><body><input type='hidden' name='x' value='1'></body></html>",
+}
+
+
+def main():
+    print("HTW Noten-Checker - Parser-Paritätstest")
+    print("=" * 50)
+
+    logger = Logger(log_level="WARNING")
+    backends = available_backends()
+    print(f"Installierte Backends: {', '.join(backends)}")
+    print(f"Nicht installiert: {', '.join(set(PARSER_BACKENDS) - set(backends)) or '-'}")
+
+    reference = SoupParser(logger)
+    failures = 0
+
+    for name in backends:
+        parser = PARSER_BACKENDS[name](logger)
+
+        for case, html in GRADE_PAGES.items():
+            expected = reference.parse_grades(html)
+            actual = parser.parse_grades(html)
+            if actual != expected:
+                failures += 1
+                print(f"❌ {name} / {case}: {actual!r} != {expected!r}")
+
+        for case, html in LOGIN_PAGES.items():
+            expected = reference.extract_form_data(html)
+            actual = parser.extract_form_data(html)
+            if actual != expected:
+                failures += 1
+                print(f"❌ {name} / {case}: {actual!r} != {expected!r}")
+
+    if failures:
+        print(f"❌ {failures} Abweichung(en) zwischen den Backends!")
+        return 1
+
+    print("✅ Alle Backends liefern identische Ergebnisse.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
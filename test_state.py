@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test-Script für den persistenten Noten-Zustand
+Prüft, dass gespeicherte Noten nach einem Neustart unverändert geladen werden
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append("src")
+
+from src.diff import diff_grades
+from src.grades import Grade
+from src.state import GradeStateStore
+
+STATES = {
+    "standard": [
+        Grade.from_text("1,3", "Mathematik I"),
+        Grade.from_text("2,0", "Programmierung"),
+    ],
+    "doppelte Versuche": [
+        Grade.from_text("5,0", "Mathematik II"),
+        Grade.from_text("5,0", "Mathematik II"),
+        Grade.from_text("2,3", "Mathematik II"),
+    ],
+    "weiterer Versuch": [
+        Grade.from_text("5,0", "Mathematik II"),
+        Grade.from_text("5,0", "Mathematik II"),
+        Grade.from_text("5,0", "Mathematik II"),
+        Grade.from_text("2,3", "Mathematik II"),
+    ],
+    "Versuch entfernt": [
+        Grade.from_text("5,0", "Mathematik II"),
+        Grade.from_text("2,3", "Mathematik II"),
+    ],
+    "leer": [],
+}
+
+
+def _restart(path: Path) -> list:
+    """Lädt den Zustand wie nach einem Neustart mit neuer Verbindung"""
+    store = GradeStateStore(str(path), "s12345")
+    try:
+        return store.load()
+    finally:
+        store.close()
+
+
+def main():
+    print("HTW Noten-Checker - Test persistenter Zustand")
+    print("=" * 50)
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "state.db"
+        store = GradeStateStore(str(path), "s12345")
+
+        # Nacheinander speichern, wie aufeinanderfolgende Prüfzyklen
+        for case, grades in STATES.items():
+            store.save(grades)
+            loaded = _restart(path)
+            diff = diff_grades(loaded, grades)
+            if sorted(loaded) != sorted(grades) or diff:
+                failures += 1
+                print(f"❌ {case}: {loaded!r} != {grades!r} ({diff.summary()})")
+            else:
+                print(f"✅ {case}: {len(loaded)} Noten")
+        store.close()
+
+        # Ohne Noten gespeichert zählt nach dem Neustart als initialisiert
+        empty = GradeStateStore(str(path), "s54321")
+        empty.load()
+        empty.save([])
+        empty.close()
+        for user, expected in (("s54321", True), ("s99999", False)):
+            store = GradeStateStore(str(path), user)
+            store.load()
+            store.close()
+            if store.initialized != expected:
+                failures += 1
+                print(f"❌ initialisiert ({user}): {store.initialized} != {expected}")
+            else:
+                print(f"✅ initialisiert ({user}): {expected}")
+
+    if failures:
+        print(f"❌ {failures} Abweichung(en) nach dem Neustart!")
+        return 1
+
+    print("✅ Gespeicherte Noten werden unverändert geladen.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())